@@ -0,0 +1,154 @@
+import math
+import neat
+import numpy as np
+
+# math.tanh applied element-wise: np.tanh may round differently from the C
+# library, and the outputs have to match neat's tanh_activation exactly
+_TANH = np.frompyfunc(math.tanh, 1, 1)
+
+
+class BatchedNetwork:
+    """All feed-forward networks of a generation, activated in one NumPy pass.
+
+    Every network is compiled into padded, layer-ordered tensors: for every
+    layer, a mask of the real nodes and their target slots, source slots,
+    weights, biases and responses, with one row per network. Padding nodes
+    write to a dummy slot and padding links have a weight of 0, so they do not
+    change any value. Links are summed one at a time in the network's own
+    order, which gives exactly the same results as FeedForwardNetwork.activate
+    for `sum` aggregation and `tanh` activation. Networks using other
+    functions are activated one by one.
+    """
+
+    def __init__(
+        self, nets: list[neat.nn.FeedForwardNetwork], config: neat.Config
+    ) -> None:
+        genome_config = config.genome_config
+        tanh = genome_config.activation_defs.get("tanh")
+        sum_aggregation = genome_config.aggregation_function_defs.get("sum")
+
+        self.nets = nets
+        self.num_inputs = len(genome_config.input_keys)
+        self.num_outputs = len(genome_config.output_keys)
+
+        # Networks which can not be compiled are activated with activate()
+        self.fallback = [
+            i
+            for i, net in enumerate(nets)
+            if any(
+                act_func is not tanh or agg_func is not sum_aggregation
+                for _, act_func, agg_func, _, _, _ in net.node_evals
+            )
+        ]
+        fallback = set(self.fallback)
+
+        # Slots of the values of every network: inputs, outputs, hidden nodes
+        slots = []
+        depths = []
+        for i, net in enumerate(nets):
+            net_slots = {key: slot for slot, key in enumerate(net.input_nodes)}
+            for key in net.output_nodes:
+                net_slots[key] = len(net_slots)
+            net_depths = {key: 0 for key in net.input_nodes}
+
+            if i not in fallback:
+                for node, _, _, _, _, links in net.node_evals:
+                    if node not in net_slots:
+                        net_slots[node] = len(net_slots)
+                    # Same layers as neat.graphs.feed_forward_layers
+                    net_depths[node] = 1 + max(net_depths[key] for key, _ in links)
+
+            slots.append(net_slots)
+            depths.append(net_depths)
+
+        # One extra slot receives the values of the padding nodes
+        self.dummy_slot = max((len(net_slots) for net_slots in slots), default=0)
+        self.num_slots = self.dummy_slot + 1
+        layer_count = max(
+            (max(net_depths.values(), default=0) for net_depths in depths), default=0
+        )
+
+        count = len(nets)
+        self.layers = []
+        for depth in range(1, layer_count + 1):
+            layer_nodes = [
+                [
+                    node_eval
+                    for node_eval in net.node_evals
+                    if i not in fallback and depths[i][node_eval[0]] == depth
+                ]
+                for i, net in enumerate(nets)
+            ]
+            width = max(len(nodes) for nodes in layer_nodes)
+            fan_in = max(
+                (len(links) for nodes in layer_nodes for *_, links in nodes), default=0
+            )
+
+            nodes_mask = np.zeros((count, width), dtype=bool)
+            targets = np.full((count, width), self.dummy_slot, dtype=np.int64)
+            sources = np.zeros((count, width, fan_in), dtype=np.int64)
+            weights = np.zeros((count, width, fan_in), dtype=np.float64)
+            biases = np.zeros((count, width), dtype=np.float64)
+            responses = np.zeros((count, width), dtype=np.float64)
+
+            for i, nodes in enumerate(layer_nodes):
+                for j, (node, _, _, bias, response, links) in enumerate(nodes):
+                    nodes_mask[i, j] = True
+                    targets[i, j] = slots[i][node]
+                    biases[i, j] = bias
+                    responses[i, j] = response
+                    for k, (key, weight) in enumerate(links):
+                        sources[i, j, k] = slots[i][key]
+                        weights[i, j, k] = weight
+
+            self.layers.append(
+                (nodes_mask, targets, sources, weights, biases, responses)
+            )
+
+    def activate(self, inputs: np.ndarray) -> np.ndarray:
+        """Activate every network on its inputs
+
+        Args:
+            inputs (np.ndarray): (N, num_inputs) inputs, one row per network
+
+        Returns:
+            np.ndarray: (N, num_outputs) outputs, one row per network
+        """
+        count = len(self.nets)
+        rows = np.arange(count)[:, None]
+
+        values = np.zeros((count, self.num_slots), dtype=np.float64)
+        values[:, : self.num_inputs] = inputs
+
+        for nodes_mask, targets, sources, weights, biases, responses in self.layers:
+            # Summed in link order like sum(), padding adds products of 0
+            total = np.zeros(targets.shape, dtype=np.float64)
+            for k in range(sources.shape[2]):
+                total = total + values[rows, sources[:, :, k]] * weights[:, :, k]
+
+            # neat's tanh_activation, which is exactly -1 or 1 beyond |z| = 20
+            z = np.maximum(-60.0, np.minimum(60.0, 2.5 * (biases + responses * total)))
+            output = np.sign(z)
+            exact = nodes_mask & (np.abs(z) < 20.0)
+            output[exact] = _TANH(z[exact]).astype(np.float64)
+            values[rows, targets] = output
+
+        outputs = values[:, self.num_inputs : self.num_inputs + self.num_outputs]
+
+        if self.fallback:
+            input_list = inputs.tolist()
+            for i in self.fallback:
+                outputs[i] = self.nets[i].activate(input_list[i])
+
+        return outputs
+
+    def choose(self, inputs: np.ndarray) -> np.ndarray:
+        """Activate every network and choose the action with the highest output
+
+        Args:
+            inputs (np.ndarray): (N, num_inputs) inputs, one row per network
+
+        Returns:
+            np.ndarray: (N,) index of the first highest output of every network
+        """
+        return np.argmax(self.activate(inputs), axis=1)
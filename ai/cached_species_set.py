@@ -0,0 +1,398 @@
+import hashlib
+
+import neat
+import numpy as np
+from neat.config import ConfigParameter, DefaultClassConfig
+from neat.math_util import mean, stdev
+from neat.species import Species
+
+
+class GeneArrays:
+    """One kind of genes (nodes or connections) of many genomes, as flat arrays.
+
+    Every gene key is interned to a small id, and the genes of every genome
+    are stored in its own dict order (the order DefaultGenome.distance sums
+    them in). A sorted array of (genome row, gene id) keys is used to find the
+    homologous genes of a genome in many other genomes at once with
+    np.searchsorted, a merge of sorted arrays instead of dict lookups.
+    """
+
+    def __init__(self, genes: list[list[tuple]], value_count: int) -> None:
+        """
+        Args:
+            genes (list[list[tuple]]): For every genome, its (key, values)
+                genes in dict order, values being a tuple of value_count floats
+            value_count (int): Number of values of every gene
+        """
+        ids: dict = {}
+        flat_ids = []
+        flat_values = []
+        self.count = np.array([len(row) for row in genes], dtype=np.int64)
+        self.start = np.concatenate(([0], np.cumsum(self.count)[:-1])).astype(np.int64)
+        for row in genes:
+            for key, values in row:
+                flat_ids.append(ids.setdefault(key, len(ids)))
+                flat_values.append(values)
+
+        self.id_count = max(1, len(ids))
+        self.ids = np.array(flat_ids, dtype=np.int64)
+        self.values = np.array(flat_values, dtype=np.float64).reshape(-1, value_count)
+
+        rows = np.repeat(np.arange(len(genes), dtype=np.int64), self.count)
+        keys = rows * self.id_count + self.ids
+        self.order = np.argsort(keys, kind="stable")
+        self.sorted_keys = keys[self.order]
+
+    def match(
+        self, row: int, other_rows: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Find the genes of one genome in other genomes
+
+        Args:
+            row (int): Row of the genome
+            other_rows (np.ndarray): (G,) rows of the other genomes
+
+        Returns:
+            tuple[np.ndarray, np.ndarray, np.ndarray]: (n, k) values of the
+            genes of the genome in dict order, (G, n) True where the gene is in
+            the other genome and (G, n, k) values of those homologous genes
+        """
+        start = self.start[row]
+        genes = slice(start, start + self.count[row])
+        queries = other_rows[:, None] * self.id_count + self.ids[None, genes]
+
+        positions = np.searchsorted(self.sorted_keys, queries)
+        positions = np.minimum(positions, max(0, len(self.sorted_keys) - 1))
+        if not len(self.sorted_keys):
+            return (
+                self.values[genes],
+                np.zeros(queries.shape, dtype=bool),
+                np.zeros((*queries.shape, self.values.shape[1]), dtype=np.float64),
+            )
+        matched = self.sorted_keys[positions] == queries
+        return self.values[genes], matched, self.values[self.order[positions]]
+
+
+class CachedSpeciesSet(neat.DefaultSpeciesSet):
+    """DefaultSpeciesSet with vectorized and cached genome distances.
+
+    Speciation is the same as DefaultSpeciesSet (same species, representatives
+    and members), but the distances of a representative to all genomes are
+    computed at once with GeneArrays, and kept across generations in a
+    cache keyed by the fingerprints (sha1 of the genes) of both genomes, so
+    unchanged pairs (e.g. elites and their representatives) are never
+    computed twice. Every distance is the exact float DefaultGenome.distance
+    returns: per-gene distances use the same operations and are summed in the
+    same order.
+
+    Configured in the [CachedSpeciesSet] section of neat-config.ini, with
+    compatibility_threshold (the same as in [DefaultSpeciesSet], used by the
+    simulation window) and distance_cache_size (maximum number of cached
+    distances).
+    """
+
+    ACTIVATION_CODES: dict[str, int] = {}
+
+    def __init__(
+        self, config: DefaultClassConfig, reporters: neat.reporting.ReporterSet
+    ):
+        super().__init__(config, reporters)
+        self.distance_cache: dict[tuple[str, str], float] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def parse_config(cls, param_dict: dict) -> DefaultClassConfig:
+        return DefaultClassConfig(
+            param_dict,
+            [
+                ConfigParameter("compatibility_threshold", float),
+                ConfigParameter("distance_cache_size", int, 1000000),
+            ],
+        )
+
+    def __getstate__(self) -> dict:
+        # The cache is not saved in the checkpoints
+        state = self.__dict__.copy()
+        state["distance_cache"] = {}
+        return state
+
+    @classmethod
+    def get_code(cls, name: str) -> float:
+        """Number standing for an activation or aggregation function name"""
+        return float(cls.ACTIVATION_CODES.setdefault(name, len(cls.ACTIVATION_CODES)))
+
+    def build_tables(
+        self, genomes: list[neat.DefaultGenome]
+    ) -> tuple[GeneArrays, GeneArrays, list[str]]:
+        """Gene arrays and fingerprints of the given genomes
+
+        Args:
+            genomes (list[neat.DefaultGenome]): The genomes, one row each
+
+        Returns:
+            tuple[GeneArrays, GeneArrays, list[str]]: Node genes, connection
+            genes and fingerprint of every genome
+        """
+        nodes = []
+        connections = []
+        fingerprints = []
+        for genome in genomes:
+            genome_nodes = [
+                (
+                    key,
+                    (
+                        node.bias,
+                        node.response,
+                        self.get_code(node.activation),
+                        self.get_code(node.aggregation),
+                    ),
+                )
+                for key, node in genome.nodes.items()
+            ]
+            genome_connections = [
+                (key, (connection.weight, float(connection.enabled)))
+                for key, connection in genome.connections.items()
+            ]
+            nodes.append(genome_nodes)
+            connections.append(genome_connections)
+
+            # Dict order is part of the fingerprint, it changes the float sums.
+            # A digest like GenomeCompiler.get_genome_hash, a collision of the
+            # built-in hash would silently return the distance of other genomes
+            fingerprints.append(
+                hashlib.sha1(
+                    repr((genome_nodes, genome_connections)).encode()
+                ).hexdigest()
+            )
+        return GeneArrays(nodes, 4), GeneArrays(connections, 2), fingerprints
+
+    @staticmethod
+    def combine(
+        gene_distances: np.ndarray,
+        matched: np.ndarray,
+        count: int,
+        other_counts: np.ndarray,
+        genome_config: neat.genome.DefaultGenomeConfig,
+    ) -> np.ndarray:
+        """Distance component of one kind of genes, like DefaultGenome.distance
+
+        Args:
+            gene_distances (np.ndarray): (G, n) distance of every gene
+            matched (np.ndarray): (G, n) True for the homologous genes
+            count (int): Number of genes of the genome
+            other_counts (np.ndarray): (G,) number of genes of the other genomes
+            genome_config (neat.genome.DefaultGenomeConfig): The genome config
+
+        Returns:
+            np.ndarray: (G,) distance component
+        """
+        # Summed one gene at a time in dict order, adding 0 for the others
+        total = np.zeros(len(other_counts), dtype=np.float64)
+        for k in range(matched.shape[1]):
+            total = total + np.where(matched[:, k], gene_distances[:, k], 0.0)
+
+        homologous = np.count_nonzero(matched, axis=1)
+        disjoint = (count - homologous) + (other_counts - homologous)
+        max_count = np.maximum(count, other_counts)
+        component = (
+            total + genome_config.compatibility_disjoint_coefficient * disjoint
+        ) / np.maximum(max_count, 1)
+        return np.where(max_count > 0, component, 0.0)
+
+    def compute_distances(
+        self,
+        node_genes: GeneArrays,
+        connection_genes: GeneArrays,
+        row: int,
+        other_rows: np.ndarray,
+        genome_config: neat.genome.DefaultGenomeConfig,
+    ) -> np.ndarray:
+        """Distances of one genome to other genomes
+
+        Args:
+            node_genes (GeneArrays): Node genes of all genomes
+            connection_genes (GeneArrays): Connection genes of all genomes
+            row (int): Row of the genome (self in DefaultGenome.distance)
+            other_rows (np.ndarray): (G,) rows of the other genomes
+            genome_config (neat.genome.DefaultGenomeConfig): The genome config
+
+        Returns:
+            np.ndarray: (G,) distances
+        """
+        weight_coefficient = genome_config.compatibility_weight_coefficient
+
+        values, matched, other = node_genes.match(row, other_rows)
+        gene_distances = np.abs(values[None, :, 0] - other[:, :, 0]) + np.abs(
+            values[None, :, 1] - other[:, :, 1]
+        )
+        gene_distances = gene_distances + (values[None, :, 2] != other[:, :, 2])
+        gene_distances = gene_distances + (values[None, :, 3] != other[:, :, 3])
+        node_distance = self.combine(
+            gene_distances * weight_coefficient,
+            matched,
+            int(node_genes.count[row]),
+            node_genes.count[other_rows],
+            genome_config,
+        )
+
+        values, matched, other = connection_genes.match(row, other_rows)
+        gene_distances = np.abs(values[None, :, 0] - other[:, :, 0])
+        gene_distances = gene_distances + (values[None, :, 1] != other[:, :, 1])
+        connection_distance = self.combine(
+            gene_distances * weight_coefficient,
+            matched,
+            int(connection_genes.count[row]),
+            connection_genes.count[other_rows],
+            genome_config,
+        )
+
+        return node_distance + connection_distance
+
+    def speciate(
+        self,
+        config: neat.Config,
+        population: dict[int, neat.DefaultGenome],
+        generation: int,
+    ) -> None:
+        """Place genomes into species by genetic similarity, see DefaultSpeciesSet"""
+        assert isinstance(population, dict)
+
+        compatibility_threshold = self.species_set_config.compatibility_threshold
+        genome_config = config.genome_config
+
+        # Old representatives are not in the population, they get rows too
+        genomes = list(population.values())
+        rows = {id(genome): row for row, genome in enumerate(genomes)}
+        for species in self.species.values():
+            if id(species.representative) not in rows:
+                rows[id(species.representative)] = len(genomes)
+                genomes.append(species.representative)
+        node_genes, connection_genes, fingerprints = self.build_tables(genomes)
+
+        def get_distances(
+            representative: neat.DefaultGenome, others: list[neat.DefaultGenome]
+        ) -> list[float]:
+            # Distances from the cache, the missing ones computed at once
+            row = rows[id(representative)]
+            other_rows = [rows[id(genome)] for genome in others]
+            keys = [(fingerprints[row], fingerprints[other]) for other in other_rows]
+            missing = [
+                i for i, key in enumerate(keys) if key not in self.distance_cache
+            ]
+            self.hits += len(keys) - len(missing)
+            self.misses += len(missing)
+
+            results = [self.distance_cache.get(key, 0.0) for key in keys]
+            if missing:
+                computed = self.compute_distances(
+                    node_genes,
+                    connection_genes,
+                    row,
+                    np.array([other_rows[i] for i in missing], dtype=np.int64),
+                    genome_config,
+                ).tolist()
+                cache_size = self.species_set_config.distance_cache_size
+                for i, computed_distance in zip(missing, computed):
+                    results[i] = computed_distance
+
+                    # Forget the oldest distances when the cache is full
+                    if len(self.distance_cache) >= cache_size:
+                        del self.distance_cache[next(iter(self.distance_cache))]
+                    self.distance_cache[keys[i]] = computed_distance
+            return results
+
+        # Distances of this call by genome keys, both ways like GenomeDistanceCache
+        distances: dict[tuple[int, int], float] = {}
+
+        def distance(
+            representative: neat.DefaultGenome,
+            genome: neat.DefaultGenome,
+            computed: float,
+        ) -> float:
+            key = (representative.key, genome.key)
+            if key not in distances:
+                distances[key] = computed
+                distances[(genome.key, representative.key)] = computed
+            return distances[key]
+
+        # Find the best representatives for each existing species.
+        # Built from an iterator like DefaultSpeciesSet: set(dict) sizes the
+        # table differently, which would change the order genomes are popped
+        unspeciated = set(iter(population.keys()))
+        new_representatives = {}
+        new_members = {}
+        for sid, species in self.species.items():
+            others = [population[gid] for gid in unspeciated]
+            computed = get_distances(species.representative, others)
+            candidates = [
+                (distance(species.representative, genome, d), genome)
+                for genome, d in zip(others, computed)
+            ]
+
+            # The new representative is the genome closest to the current representative.
+            _, new_rep = min(candidates, key=lambda x: x[0])
+            new_rid = new_rep.key
+            new_representatives[sid] = new_rid
+            new_members[sid] = [new_rid]
+            unspeciated.remove(new_rid)
+
+        # Distances of every representative to all the genomes left, computed
+        # once per representative instead of once per genome
+        representative_distances: dict[int, dict[int, float]] = {}
+
+        def get_representative_distances(rid: int, gid: int) -> dict[int, float]:
+            if rid not in representative_distances:
+                left = [population[gid]] + [population[key] for key in unspeciated]
+                representative_distances[rid] = dict(
+                    zip(
+                        (genome.key for genome in left),
+                        get_distances(population[rid], left),
+                    )
+                )
+            return representative_distances[rid]
+
+        # Partition population into species based on genetic similarity.
+        while unspeciated:
+            gid = unspeciated.pop()
+            g = population[gid]
+
+            # Find the species with the most similar representative.
+            candidates = []
+            for sid, rid in new_representatives.items():
+                d = distance(
+                    population[rid], g, get_representative_distances(rid, gid)[gid]
+                )
+                if d < compatibility_threshold:
+                    candidates.append((d, sid))
+
+            if candidates:
+                _, sid = min(candidates, key=lambda x: x[0])
+                new_members[sid].append(gid)
+            else:
+                # No species is similar enough, create a new species, using
+                # this genome as its representative.
+                sid = next(self.indexer)
+                new_representatives[sid] = gid
+                new_members[sid] = [gid]
+
+        # Update species collection based on new speciation.
+        self.genome_to_species = {}
+        for sid, rid in new_representatives.items():
+            s = self.species.get(sid)
+            if s is None:
+                s = Species(sid, generation)
+                self.species[sid] = s
+
+            members = new_members[sid]
+            for gid in members:
+                self.genome_to_species[gid] = sid
+
+            member_dict = dict((gid, population[gid]) for gid in members)
+            s.update(population[rid], member_dict)
+
+        gdmean = mean(distances.values())
+        gdstdev = stdev(distances.values())
+        self.reporters.info(
+            f"Mean genetic distance {gdmean:.3f}, standard deviation {gdstdev:.3f}"
+        )
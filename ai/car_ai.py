@@ -1,13 +1,18 @@
 import neat
-import pygame
+import numpy as np
+
+from constants import FPS
 from neural_network.nn import NN
-from render.car import Car, Action
+from ai.car_fleet import FleetSetup
+from ai.fleet_simulation import FleetSimulation
 
 from render.game_state import GameState
 
 
 class CarAI:
-    TIME_LIMIT = 60
+    # Length of a generation, see FleetSimulation
+    TIME_LIMIT = FleetSimulation.TIME_LIMIT
+    TICK_LIMIT = FleetSimulation.TICK_LIMIT
 
     def __init__(
         self,
@@ -15,31 +20,45 @@ class CarAI:
         genomes: list[tuple[int, neat.DefaultGenome]],
         game_state: GameState,
     ):
-        game_state.CURRENT_GENERATION += 1
         self.GAME_STATE = game_state
 
         self.genomes = genomes
 
-        self.cars: list[Car] = []
-        self.nets: list[neat.nn.FeedForwardNetwork] = []
-
         self.BEST_FITNESS: float = 0
 
-        # Visual Neural Network (for simulation)
-        self.VISUAL_NNS: list[NN] = []
+        # Visual Neural Network (for simulation), only built for the best genome
+        self.CONFIG = config
+        self.VISUAL_NNS: dict[int, NN] = {}  # Genome key -> NN
         self.BEST_VISUAL_NN: NN | None = None
+        self.BEST_VISUAL_INDEX = -1
+
+        # All cars are simulated together, see CarRenderer for drawing
+        self.SIMULATION = FleetSimulation(
+            config, genomes, FleetSetup.from_game_state(game_state)
+        )
+        self.FLEET = self.SIMULATION.FLEET
+        self.nets = self.SIMULATION.nets
 
-        # We create a neural network for every given genome
         for _, genome in genomes:
-            net = neat.nn.FeedForwardNetwork.create(genome, config)
-            self.nets.append(net)
             genome.fitness = 0  # type: ignore
-            self.cars.append(Car(game_state))
-            self.VISUAL_NNS.append(NN(config, genome, (60, 130)))
 
-        self.remaining_cars = len(self.cars)
+        # Inputs and choices of the last tick, shown by the visual network
+        self.LAST_INPUTS = np.zeros_like(self.SENSOR_DATA)
+        self.LAST_CHOICES = np.zeros(len(genomes), dtype=np.int64)
+
+        self.remaining_cars = len(genomes)
         self.best_input = None
 
+    @property
+    def TICKS(self) -> int:
+        """Simulation ticks since the generation started"""
+        return self.SIMULATION.TICKS
+
+    @property
+    def SENSOR_DATA(self) -> np.ndarray:
+        """Sensor distances of every car, one row per car (network inputs)"""
+        return self.FLEET.sensor_data
+
     def compute(self) -> None:
         """Compute the next move of every car and update their fitness
 
@@ -48,68 +67,94 @@ class CarAI:
             track (pygame.Surface): The track on which the car is being drawn
             width (int): The width of the window
         """
-        i = 0
-        for car, net in zip(self.cars, self.nets):
+        # Activate the neural networks and get the outputs from the sensor data (input)
+        self.LAST_INPUTS = self.SENSOR_DATA.copy()
+        choices = self.SIMULATION.compute_actions()
+        self.LAST_CHOICES = choices
 
-            car_data = car.get_data()
+        # 0: Left, 1: Right, 2: Accelerate, 3: Brake
+        self.FLEET.apply_actions(choices)
 
-            # Activate the neural network and get the output from the car_data (input)
-            output = net.activate(car_data)
+        # Number of cars which are still alive
+        self.remaining_cars = int(np.count_nonzero(self.FLEET.alive))
 
-            # Output gets treated and the car is updated in the next lines
-            choice = output.index(max(output))
+    def compute_reward(self) -> None:
+        # Move all cars, collisions, sensors and sprites are updated together
+        rewards = self.SIMULATION.update()
+
+        # Then compute rewards
+        reward_list = rewards.tolist()
+        for i in np.flatnonzero(self.FLEET.alive).tolist():
+            self.genomes[i][1].fitness = reward_list[i]  # type: ignore
+            if reward_list[i] > self.BEST_FITNESS:
+                self.BEST_FITNESS = reward_list[i]
+
+        # Now find the best alive genome and show its NN
+        # Also Ignore the cars which have reached the finish line
+        running = self.FLEET.alive & ~self.FLEET.finished
+
+        # If we found a best alive genome, show its neural network
+        if running.any():
+            best_alive_index = int(np.argmax(np.where(running, rewards, -np.inf)))
+            self.BEST_VISUAL_NN = self.get_visual_nn(best_alive_index)
+            self.BEST_VISUAL_INDEX = best_alive_index
+            self.GAME_STATE.BEST_VISUAL_NN = self.BEST_VISUAL_NN
 
-            # TODO
-            # Refreshing nodes of all neural networks
-            for node in self.VISUAL_NNS[i].nodes:
+        # Refreshing nodes of the shown neural network only
+        if self.BEST_VISUAL_NN is not None:
+            car_data = self.LAST_INPUTS[self.BEST_VISUAL_INDEX].tolist()
+            choice = int(self.LAST_CHOICES[self.BEST_VISUAL_INDEX])
+            for node in self.BEST_VISUAL_NN.nodes:
                 node.inputs = car_data
                 node.output = choice
 
-            # 0: Left
-            if choice == Action.TURN_LEFT:
-                car.turn_left()
+    def get_visual_nn(self, index: int) -> NN:
+        """Get the visual neural network of a genome, built the first time only
 
-            # 1: Right
-            elif choice == Action.TURN_RIGHT:
-                car.turn_right()
+        Args:
+            index (int): Index of the genome
 
-            # 2: Accelerate
-            elif choice == Action.ACCELERATE:
-                car.accelerate()
+        Returns:
+            NN: The visual neural network
+        """
+        genome_key, genome = self.genomes[index]
+        if genome_key not in self.VISUAL_NNS:
+            self.VISUAL_NNS[genome_key] = NN(self.CONFIG, genome, (60, 130))
+        return self.VISUAL_NNS[genome_key]
 
-            # 3: Brake
-            elif choice == Action.BRAKE:
-                car.brake()
+    def check_finish_line_collisions(self) -> None:
+        """Check every running car against the finish line"""
+        self.FLEET.check_finish_line()
 
-            i += 1
+    def step(self) -> bool:
+        """Run one simulation tick for every car
 
-        # Refresh cars sprites, number of cars which are still alive and update their fitness
-        self.remaining_cars = sum(1 for car in self.cars if car.alive)
+        Returns:
+            bool: True if the generation is over
+        """
+        self.compute()
+        self.compute_reward()
+        self.GAME_STATE.BEST_FITNESS = self.BEST_FITNESS
 
-    def compute_reward(self, track: pygame.Surface) -> None:
-        # First update all sprites and compute rewards
-        for i, car in enumerate(self.cars):
-            # Update sprite regardless of alive status to handle dead sprite rendering
-            car.update_sprite(track)
-            if car.alive:
-                self.genomes[i][1].fitness = car.get_reward()  # type: ignore
-                if self.genomes[i][1].fitness > self.BEST_FITNESS:  # type: ignore
-                    self.BEST_FITNESS = self.genomes[i][1].fitness  # type: ignore
+        # Check for finish_line collisions
+        self.check_finish_line_collisions()
+        self.SIMULATION.WATCHDOG.check()
 
-        # Now find the best alive genome and show its NN
-        best_alive_fitness = -float("inf")
-        best_alive_index = -1
-
-        for i, car in enumerate(self.cars):
-            if car.alive and self.genomes[i][1].fitness is not None:
-                # Also Ignore if the car has reached the finish line
-                if car.reached_finish_line:
-                    continue
-                if self.genomes[i][1].fitness > best_alive_fitness:
-                    best_alive_fitness = self.genomes[i][1].fitness
-                    best_alive_index = i
+        self.SIMULATION.TICKS += 1
+        return self.is_generation_over()
 
-        # If we found a best alive genome, show its neural network
-        if best_alive_index != -1:
-            self.BEST_VISUAL_NN = self.VISUAL_NNS[best_alive_index]
-            self.GAME_STATE.BEST_VISUAL_NN = self.BEST_VISUAL_NN
+    def get_time_left(self) -> float:
+        """Simulated seconds left before the time limit of the generation"""
+        return max(0, CarAI.TICK_LIMIT - self.TICKS) / FPS
+
+    def is_generation_over(self) -> bool:
+        """Update the alive car count and check the end conditions of the generation
+
+        Returns:
+            bool: True if every car has crashed or finished, or the tick limit is reached
+        """
+        active_cars = int(np.count_nonzero(self.FLEET.alive))
+        self.remaining_cars = active_cars
+        self.GAME_STATE.ALIVE_CARS = active_cars
+
+        return self.SIMULATION.is_over()
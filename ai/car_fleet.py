@@ -0,0 +1,425 @@
+import numpy as np
+from typing import TYPE_CHECKING
+
+from constants import CAR_SIZE_RATIO
+
+from ai.path_history import PathHistory
+from ai.sensor_engine import SensorEngine
+
+if TYPE_CHECKING:
+    from render.game_state import GameState
+
+
+class Action:
+    TURN_LEFT = 0
+    TURN_RIGHT = 1
+    ACCELERATE = 2
+    BRAKE = 3
+
+
+class CarState:
+    """Outcome of a car, see CarFleet.get_states"""
+
+    RUNNING = 0
+    CRASHED = 1
+    FINISHED = 2
+    RETIRED = 3  # Stopped by the ProgressWatchdog, not a crash
+
+
+class FleetSetup:
+    """Everything a CarFleet needs from the game state, as plain data.
+
+    It holds no pygame objects, so it can be pickled and sent to worker
+    processes, which build their own fleets from it.
+    """
+
+    def __init__(
+        self,
+        start_center: tuple[float, float],
+        start_angle: float,
+        car_size: float,
+        is_map: bool,
+        finish_line_rect: tuple[int, int, int, int],
+        track_length: float,
+        wall_mask: np.ndarray,
+        wall_distance: np.ndarray,
+    ) -> None:
+        """
+        Args:
+            start_center (tuple[float, float]): Center of the cars at the start
+            start_angle (float): Angle of the cars at the start, in degrees
+            car_size (float): Width of the cars, the height keeps CAR_SIZE_RATIO
+            is_map (bool): True for the city map, cars are slower there
+            finish_line_rect (tuple[int, int, int, int]): x, y, width, height
+            track_length (float): Length of the track, used to scale rewards
+            wall_mask (np.ndarray): The track wall mask, indexed as [x, y]
+            wall_distance (np.ndarray): The track wall distance field
+        """
+        self.start_center = start_center
+        self.start_angle = start_angle
+        self.car_size = car_size
+        self.is_map = is_map
+        self.finish_line_rect = finish_line_rect
+        self.track_length = track_length
+        self.wall_mask = wall_mask
+        self.wall_distance = wall_distance
+
+    @classmethod
+    def from_game_state(cls, game_state: "GameState") -> "FleetSetup":
+        """Read the car placement, finish line and track of the game state
+
+        All positions are converted to coordinates relative to the track canvas.
+        """
+        track = game_state.TRACK
+        offset_x, offset_y = game_state.TRACK_CANVAS_RECT.topleft
+
+        CAR_PREVIEW_DATA = game_state.CAR_PREVIEW_DATA
+        abs_center_pos = CAR_PREVIEW_DATA.position  # Absolute screen center
+
+        # Finish line rect, like a pygame rect of whole pixels
+        final_marker = game_state.FINAL_MARKER_PREVIEW_DATA
+        finish_size = int(final_marker.size)
+        finish_line_rect = (
+            final_marker.position[0] - offset_x - finish_size // 2,
+            final_marker.position[1] - offset_y - finish_size // 2,
+            finish_size,
+            finish_size,
+        )
+
+        return cls(
+            start_center=(abs_center_pos[0] - offset_x, abs_center_pos[1] - offset_y),
+            start_angle=CAR_PREVIEW_DATA.rotation,
+            car_size=CAR_PREVIEW_DATA.size,
+            is_map=track.IS_MAP,
+            finish_line_rect=finish_line_rect,
+            track_length=track.TRACK_LENGTH,
+            wall_mask=track.get_wall_mask(),
+            wall_distance=track.get_wall_distance(),
+        )
+
+
+class CarFleet:
+    """Physics of a whole population of cars, stored as a structure of arrays.
+
+    Every car is one row of the NumPy arrays below (center, angle, speed, alive,
+    ...), so actions, motion, collisions, sensors and rewards are applied to all
+    cars with a few array operations instead of Python calls per car. The fleet
+    is pure data (no pygame), drawing is done by CarRenderer.
+
+    All coordinates are relative to the track canvas.
+    """
+
+    MINIMUM_SPEED: float = 3
+    MAP_MINIMUM_SPEED: float = 1
+    MAXIMUM_SPEED: float = 20
+    MAP_MAXIMUM_SPEED: float = 10
+    ANGLE_INCREMENT: float = 10
+    MAP_ANGLE_INCREMENT: float = 5
+    SPEED_INCREMENT: float = 1
+    MAP_SPEED_INCREMENT: float = 0.5
+
+    DEFAULT_SPEED: float = 5
+    MAP_DEFAULT_SPEED: float = 2
+
+    # Angles of the corners used for the collision check
+    CORNER_ANGLES = np.array([30, 150, 210, 330], dtype=np.float64)
+
+    FINISH_LINE_BONUS: float = 150
+
+    def __init__(self, setup: FleetSetup, count: int) -> None:
+        self.setup = setup
+        self.count = count
+
+        # Size of the car and of its (unrotated) sprite, pygame truncates to pixels
+        size = setup.car_size
+        self.CAR_SIZE = np.array([size, size * CAR_SIZE_RATIO], dtype=np.float64)
+        self.SPRITE_SIZE = np.trunc(self.CAR_SIZE).astype(np.int64)
+
+        if setup.is_map:
+            self.MIN_SPEED = self.MAP_MINIMUM_SPEED
+            self.MAX_SPEED = self.MAP_MAXIMUM_SPEED
+            self.SPEED_STEP = self.MAP_SPEED_INCREMENT
+            self.ANGLE_STEP = self.MAP_ANGLE_INCREMENT
+            default_speed = self.MAP_DEFAULT_SPEED
+        else:
+            self.MIN_SPEED = self.MINIMUM_SPEED
+            self.MAX_SPEED = self.MAXIMUM_SPEED
+            self.SPEED_STEP = self.SPEED_INCREMENT
+            self.ANGLE_STEP = self.ANGLE_INCREMENT
+            default_speed = self.DEFAULT_SPEED
+
+        # --- State of every car, one row per car ---
+        self.centers = np.tile(
+            np.array(setup.start_center, dtype=np.float64), (count, 1)
+        )
+        self.angles = np.full(count, setup.start_angle, dtype=np.float64)
+        self.speeds = np.full(count, default_speed, dtype=np.float64)
+        self.alive = np.ones(count, dtype=bool)
+        self.finished = np.zeros(count, dtype=bool)
+        self.retired = np.zeros(count, dtype=bool)  # Not alive, but did not crash
+        self.driven_distance = np.zeros(count, dtype=np.float64)
+        self.speed_penalty = np.zeros(count, dtype=np.float64)
+        self.final_rewards = np.zeros(count, dtype=np.float64)
+        self.corners = np.zeros((count, len(self.CORNER_ANGLES), 2), dtype=np.float64)
+
+        # Sprite placement: top-left of the rotated sprite and the angle it was
+        # rotated with. Dead cars keep the sprite they had when they crashed.
+        self.positions = np.zeros((count, 2), dtype=np.int64)
+        self.sprite_sizes = np.zeros((count, 2), dtype=np.int64)
+        self.sprite_angles = np.zeros(count, dtype=np.float64)
+        self.rendered_as_dead = np.zeros(count, dtype=bool)
+
+        # Sensors, cast for all moving cars at once
+        self.sensor_engine = SensorEngine(setup.wall_distance)
+        sensor_count = len(SensorEngine.SENSOR_ANGLES)
+        self.sensor_data = np.zeros((count, sensor_count), dtype=np.int64)
+        self.sensor_end_points = np.zeros((count, sensor_count, 2), dtype=np.int64)
+        self.has_sensors = np.zeros(count, dtype=bool)
+
+        self.path_history = PathHistory(count)
+
+        self.wall_mask = setup.wall_mask
+
+        # Reward normalization
+        self.TRACK_LENGTH = setup.track_length
+        self.MAX_EXPECTED_SPEED = self.TRACK_LENGTH / 100
+        self.PENALTY_FACTOR = self.TRACK_LENGTH / 1000
+
+        self.FINISH_LINE_RECT = setup.finish_line_rect
+
+        self.refresh_sprites()
+
+    def rotated_sprite_sizes(self, angles: np.ndarray) -> np.ndarray:
+        """Size of the sprite once rotated with pygame.transform.rotate
+
+        Args:
+            angles (np.ndarray): (N,) rotation angles in degrees
+
+        Returns:
+            np.ndarray: (N, 2) width and height of the rotated sprites
+        """
+        width, height = self.SPRITE_SIZE.tolist()
+
+        # Sprites are rotated by angle mod 360 (see CarSprites), pygame uses a
+        # float angle and the same bounding box formula
+        angles = np.mod(angles, 360).astype(np.float32).astype(np.float64)
+        radians = angles * 0.01745329251994329
+        sin = np.sin(radians)
+        cos = np.cos(radians)
+        rotated_width = np.maximum(
+            np.abs(cos * width + sin * height), np.abs(cos * width - sin * height)
+        )
+        rotated_height = np.maximum(
+            np.abs(sin * width + cos * height), np.abs(sin * width - cos * height)
+        )
+        sizes = np.stack((rotated_width, rotated_height), axis=1).astype(np.int64)
+
+        # Multiples of 90 degrees are exact rotations
+        right_angles = np.fmod(angles, 90) == 0
+        quarter_turns = np.trunc(angles[right_angles]).astype(np.int64) // 90
+        sizes[right_angles] = np.where(
+            (quarter_turns % 2 == 1)[:, None],
+            [height, width],
+            [width, height],
+        )
+        return sizes
+
+    def refresh_sprites(self) -> None:
+        """Place the sprites of every car on its center, like a pygame rect"""
+        update = np.flatnonzero(~self.rendered_as_dead)
+        if update.size:
+            sizes = self.rotated_sprite_sizes(self.angles[update])
+
+            # Rect centers are whole pixels, rounded half away from zero
+            centers = self.centers[update]
+            rounded = np.floor(np.abs(centers))
+            rounded += np.abs(centers) - rounded >= 0.5
+            rounded = np.copysign(rounded, centers).astype(np.int64)
+
+            self.centers[update] = rounded
+            self.positions[update] = rounded - sizes // 2
+            self.sprite_sizes[update] = sizes
+            self.sprite_angles[update] = self.angles[update]
+
+        self.rendered_as_dead |= ~self.alive
+
+    def apply_actions(self, choices: np.ndarray) -> None:
+        """Apply the chosen action of every car, finished cars ignore them
+
+        Args:
+            choices (np.ndarray): (N,) Action of every car
+        """
+        running = ~self.finished
+
+        self.angles[running & (choices == Action.TURN_LEFT)] += self.ANGLE_STEP
+        self.angles[running & (choices == Action.TURN_RIGHT)] -= self.ANGLE_STEP
+
+        accelerate = running & (choices == Action.ACCELERATE)
+        capped = accelerate & (self.speeds + self.SPEED_STEP > self.MAX_SPEED)
+        self.speeds[accelerate & ~capped] += self.SPEED_STEP
+        self.speeds[capped] = self.MAX_SPEED
+        self.speed_penalty[capped] += 0.01
+
+        # We don't want to go backwards nor going too slow
+        brake = running & (choices == Action.BRAKE)
+        floored = brake & (self.speeds - self.SPEED_STEP < self.MIN_SPEED)
+        self.speeds[brake & ~floored] -= self.SPEED_STEP
+        self.speeds[floored] = self.MIN_SPEED
+        self.speed_penalty[floored] += 0.01
+
+    def update(self) -> None:
+        """Move every running car, then check collisions and cast sensors"""
+        moving = np.flatnonzero(self.alive & ~self.finished)
+
+        if moving.size:
+            radians = np.radians(360 - self.angles[moving])
+            speeds = self.speeds[moving]
+            self.centers[moving, 0] += np.cos(radians) * speeds
+            self.centers[moving, 1] += np.sin(radians) * speeds
+
+            # Driven distance counts the last move even if the car crashes
+            self.driven_distance[moving] += speeds
+
+            self.path_history.record(moving, self.centers[moving], self.angles[moving])
+
+            self.refresh_corners(moving)
+            crashed = self.check_collisions(moving)
+            self.alive[moving[crashed]] = False
+
+            # Update sensors only for the cars still alive
+            sensing = moving[~crashed]
+            if sensing.size:
+                end_points, distances = self.sensor_engine.cast(
+                    self.centers[sensing], self.angles[sensing]
+                )
+                self.sensor_end_points[sensing] = end_points
+                self.sensor_data[sensing] = distances
+                self.has_sensors[sensing] = True
+
+        # Regardless of alive status, dead cars keep their last sprite
+        self.refresh_sprites()
+
+    def refresh_corners(self, indices: np.ndarray) -> None:
+        """Refresh the corners of the given cars
+
+        Args:
+            indices (np.ndarray): Indices of the cars
+        """
+        half_size = 0.5 * self.CAR_SIZE
+        radians = np.radians(
+            360 - (self.angles[indices, None] + self.CORNER_ANGLES[None, :])
+        )
+        centers = self.centers[indices]
+        self.corners[indices, :, 0] = (
+            centers[:, 0, None] + np.cos(radians) * half_size[0]
+        )
+        self.corners[indices, :, 1] = (
+            centers[:, 1, None] + np.sin(radians) * half_size[1]
+        )
+
+    def check_collisions(self, indices: np.ndarray) -> np.ndarray:
+        """Check if the given cars are colliding with the walls or leaving the track
+
+        Args:
+            indices (np.ndarray): Indices of the cars
+
+        Returns:
+            np.ndarray: (N,) True for every car with a corner on a wall
+        """
+        track_x, track_y = self.wall_mask.shape
+        corners_x = self.corners[indices, :, 0]
+        corners_y = self.corners[indices, :, 1]
+
+        outside = (
+            (corners_x < 0)
+            | (corners_x >= track_x)
+            | (corners_y < 0)
+            | (corners_y >= track_y)
+        )
+        on_wall = self.wall_mask[
+            np.where(outside, 0, corners_x).astype(np.int64),
+            np.where(outside, 0, corners_y).astype(np.int64),
+        ]
+        return np.any(outside | on_wall, axis=1)
+
+    def check_finish_line(self) -> None:
+        """Check every running car against the finish line"""
+        running = np.flatnonzero(self.alive & ~self.finished)
+        if not running.size:
+            return
+
+        finish_x, finish_y, finish_width, finish_height = self.FINISH_LINE_RECT
+        car_width, car_height = self.SPRITE_SIZE.tolist()
+        if min(finish_width, finish_height, car_width, car_height) <= 0:
+            return
+
+        # Same overlap test as pygame.Rect.colliderect
+        car_x = self.positions[running, 0]
+        car_y = self.positions[running, 1]
+        reached = running[
+            (car_x < finish_x + finish_width)
+            & (car_y < finish_y + finish_height)
+            & (car_x + car_width > finish_x)
+            & (car_y + car_height > finish_y)
+        ]
+
+        self.final_rewards[reached] = (
+            self.compute_rewards(reached) + self.FINISH_LINE_BONUS
+        )
+        self.finished[reached] = True
+
+    def get_states(self) -> np.ndarray:
+        """Get the CarState of every car
+
+        Returns:
+            np.ndarray: (N,) state of every car
+        """
+        states = np.full(self.count, CarState.RUNNING, dtype=np.int64)
+        states[~self.alive] = CarState.CRASHED
+        states[self.retired] = CarState.RETIRED
+        states[self.finished] = CarState.FINISHED
+        return states
+
+    def compute_rewards(self, indices: np.ndarray) -> np.ndarray:
+        """Reward of the given cars as if they had not reached the finish line
+
+        Args:
+            indices (np.ndarray): Indices of the cars
+
+        Returns:
+            np.ndarray: (N,) rewards
+        """
+        driven_distance = self.driven_distance[indices]
+
+        # Scale distance reward to 0-100
+        distance_reward = np.minimum(100, driven_distance / self.TRACK_LENGTH * 100)
+
+        # Scale speed reward to 0-20
+        speed_reward = np.minimum(
+            20, (self.speeds[indices] / self.MAX_EXPECTED_SPEED) * 20
+        )
+
+        # Scale malus to 0-10
+        malus = np.minimum(10, self.speed_penalty[indices] / self.PENALTY_FACTOR)
+
+        # Scale progress factor to give 1-1.2x multiplier based on track length
+        progress_factor = 1.0 + (
+            np.minimum(1.0, driven_distance / (self.TRACK_LENGTH * 0.75)) * 0.2
+        )
+
+        # Distance and speed, minus the malus, scaled by the progress
+        raw_reward = distance_reward + speed_reward - malus
+
+        return raw_reward * progress_factor
+
+    def get_rewards(self) -> np.ndarray:
+        """Get the reward of every car, finished cars keep their final reward
+
+        Returns:
+            np.ndarray: (N,) rewards
+        """
+        return np.where(
+            self.finished,
+            self.final_rewards,
+            self.compute_rewards(np.arange(self.count)),
+        )
@@ -0,0 +1,133 @@
+import json
+import os
+
+
+class CheckpointStore:
+    """The checkpoints of one track, with a JSON index of what they contain.
+
+    The index (index.json in the checkpoint folder) has one entry per
+    checkpoint with its generation, best fitness, species count and file size,
+    so the checkpoints can be listed without unpickling them. Checkpoint files
+    without an entry (e.g. written before the index existed) are listed with
+    unknown fitness and species count.
+    """
+
+    INDEX_FILE = "index.json"
+    FILE_PREFIX = "checkpoint-"
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        self.index_path = os.path.join(directory, self.INDEX_FILE)
+
+    @classmethod
+    def get_generation(cls, filename: str) -> int | None:
+        """Generation of a checkpoint file, None if it is not a checkpoint
+
+        Args:
+            filename (str): Name of the file, without its folder
+
+        Returns:
+            int | None: Generation number
+        """
+        if not filename.startswith(cls.FILE_PREFIX):
+            return None
+        generation = filename[len(cls.FILE_PREFIX) :]
+        return int(generation) if generation.isdigit() else None
+
+    def load_index(self) -> dict[str, dict]:
+        """Read the index, file name -> entry, empty if it is missing or malformed"""
+        if not os.path.exists(self.index_path):
+            return {}
+        try:
+            with open(self.index_path, "r") as f:
+                entries = json.load(f)["checkpoints"]
+            return {entry["file"]: entry for entry in entries}
+        except (OSError, ValueError, KeyError, TypeError):
+            return {}
+
+    def save_index(self, entries: dict[str, dict]) -> None:
+        """Atomically replace the index with the given entries"""
+        data = {"checkpoints": sorted(entries.values(), key=lambda x: x["generation"])}
+        temporary = f"{self.index_path}.tmp"
+        with open(temporary, "w") as f:
+            json.dump(data, f, indent=4)
+        os.replace(temporary, self.index_path)
+
+    def get_entries(self) -> list[dict]:
+        """Every checkpoint in the folder, sorted by generation
+
+        Returns:
+            list[dict]: Entries with file, generation, best_fitness (float or
+            None), species (int or None) and size (bytes)
+        """
+        if not os.path.exists(self.directory):
+            return []
+
+        index = self.load_index()
+        entries = []
+        for filename in os.listdir(self.directory):
+            generation = self.get_generation(filename)
+            if generation is None:
+                continue
+            entry = index.get(filename) or {
+                "file": filename,
+                "generation": generation,
+                "best_fitness": None,
+                "species": None,
+                "size": os.path.getsize(os.path.join(self.directory, filename)),
+            }
+            entries.append(entry)
+
+        entries.sort(key=lambda x: x["generation"])
+        return entries
+
+    def add(
+        self, filename: str, generation: int, best_fitness: float | None, species: int
+    ) -> None:
+        """Add the entry of a checkpoint file which was just written
+
+        Args:
+            filename (str): Name of the file, without its folder
+            generation (int): Generation of the checkpoint
+            best_fitness (float | None): Best fitness of the generation
+            species (int): Number of species
+        """
+        entries = {entry["file"]: entry for entry in self.get_entries()}
+        entries[filename] = {
+            "file": filename,
+            "generation": generation,
+            "best_fitness": best_fitness,
+            "species": species,
+            "size": os.path.getsize(os.path.join(self.directory, filename)),
+        }
+        self.save_index(entries)
+
+    def apply_retention(self, max_history: int, max_best: int = 1) -> None:
+        """Delete old checkpoints, keeping the last ones and the best ones
+
+        Args:
+            max_history (int): Number of most recent checkpoints to keep
+            max_best (int): Number of checkpoints with the highest best_fitness
+                to keep besides the most recent ones
+        """
+        entries = self.get_entries()
+        if len(entries) <= max_history:
+            return
+
+        keep = {entry["file"] for entry in entries[-max_history:]}
+        rated = [entry for entry in entries if entry["best_fitness"] is not None]
+        rated.sort(key=lambda x: x["best_fitness"], reverse=True)
+        keep.update(entry["file"] for entry in rated[:max_best])
+
+        # Files next to a deleted checkpoint (e.g. its best genome) go with it
+        removed = [entry["file"] for entry in entries if entry["file"] not in keep]
+        for filename in os.listdir(self.directory):
+            if any(
+                filename == checkpoint or filename.startswith(f"{checkpoint}.")
+                for checkpoint in removed
+            ):
+                os.remove(os.path.join(self.directory, filename))
+
+        self.save_index(
+            {entry["file"]: entry for entry in entries if entry["file"] in keep}
+        )
@@ -0,0 +1,167 @@
+import atexit
+import gzip
+import os
+import pickle
+import queue
+import random
+import threading
+
+import neat
+
+from ai.checkpoint_store import CheckpointStore
+from ai.genome_export import GenomeExport
+
+
+class AsyncCheckpointer(neat.Checkpointer):
+    """A neat.Checkpointer which compresses and writes on a background thread.
+
+    At the end of a generation the state is only pickled (a cheap snapshot,
+    the genomes are modified by the next generation), then a writer thread
+    gzips it and writes it to disk. The files are the same as the ones of
+    neat.Checkpointer, so they are restored with
+    neat.Checkpointer.restore_checkpoint. Every file is written to a temporary
+    file first and then renamed, so a crash never leaves a half-written
+    checkpoint. The queue is bounded: if the writer falls behind, the next
+    checkpoint waits for a free slot instead of keeping every snapshot in
+    memory. The writer thread is started with the first checkpoint.
+
+    The writer thread also exports the best genome of every checkpoint (see
+    GenomeExport), adds the checkpoint to the CheckpointStore index of its
+    folder and deletes the old checkpoints beyond max_history, except the
+    max_best ones with the highest fitness.
+    """
+
+    MAX_PENDING = 2
+    COMPRESS_LEVEL = 5
+
+    def __init__(
+        self,
+        generation_interval: int | None = 100,
+        time_interval_seconds: float | None = 300,
+        filename_prefix: str = "neat-checkpoint-",
+        max_history: int | None = None,
+        max_best: int = 1,
+    ) -> None:
+        """
+        Args:
+            generation_interval (int | None): Generations between checkpoints
+            time_interval_seconds (float | None): Seconds between checkpoints
+            filename_prefix (str): Path of the files, without the generation
+            max_history (int | None): Number of most recent checkpoints to
+                keep (plus the best ones), all of them if None
+            max_best (int): Number of checkpoints with the highest fitness
+                kept besides the most recent ones
+        """
+        super().__init__(generation_interval, time_interval_seconds, filename_prefix)
+        self.max_history = max_history
+        self.max_best = max_best
+        self.store = CheckpointStore(os.path.dirname(filename_prefix))
+
+        # Best fitness of the last evaluated generation, saved in the index
+        self.best_fitness: float | None = None
+
+        self.pending: queue.Queue[tuple[str, bytes, dict, dict | None] | None] = (
+            queue.Queue(self.MAX_PENDING)
+        )
+        self.writer: threading.Thread | None = None
+
+    def __getstate__(self) -> dict:
+        # The reporters are pickled with the species set of every checkpoint
+        state = self.__dict__.copy()
+        del state["pending"]
+        del state["writer"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self.pending = queue.Queue(self.MAX_PENDING)
+        self.writer = None
+
+    def post_evaluate(
+        self,
+        config: neat.Config,
+        population: dict[int, neat.DefaultGenome],
+        species: neat.DefaultSpeciesSet,
+        best_genome: neat.DefaultGenome,
+    ) -> None:
+        self.best_fitness = best_genome.fitness
+
+    def save_checkpoint(
+        self,
+        config: neat.Config,
+        population: dict[int, neat.DefaultGenome],
+        species_set: neat.DefaultSpeciesSet,
+        generation: int,
+    ) -> None:
+        """Snapshot the current state, it is written by the writer thread"""
+        # Started with the first checkpoint, and again if it ever stopped, so
+        # the bounded queue always has a consumer
+        if self.writer is None or not self.writer.is_alive():
+            self.writer = threading.Thread(target=self.write_checkpoints, daemon=True)
+            self.writer.start()
+
+            # Pending checkpoints are still written when the program exits
+            atexit.unregister(self.close)
+            atexit.register(self.close)
+
+        filename = f"{self.filename_prefix}{generation}"
+        print(f"Saving checkpoint to {filename}")
+
+        data = (generation, config, population, species_set, random.getstate())
+        info = {
+            "generation": generation,
+            "best_fitness": self.best_fitness,
+            "species": len(species_set.species),
+        }
+        best_genome = GenomeExport.get_best_genome(population)
+        if best_genome is not None:
+            best_genome = GenomeExport.to_dict(*best_genome, config)
+
+        self.pending.put(
+            (filename, pickle.dumps(data, pickle.HIGHEST_PROTOCOL), info, best_genome)
+        )
+
+    def write_checkpoints(self) -> None:
+        """Writer thread: compress and write the snapshots until closed"""
+        while True:
+            item = self.pending.get()
+            if item is None:
+                return
+
+            filename, data, info, best_genome = item
+            try:
+                self.write_file(filename, gzip.compress(data, self.COMPRESS_LEVEL))
+                if best_genome is not None:
+                    GenomeExport.save(GenomeExport.get_path(filename), best_genome)
+                self.store.add(os.path.basename(filename), **info)
+                if self.max_history is not None:
+                    self.store.apply_retention(self.max_history, self.max_best)
+            except Exception as error:
+                # A failed checkpoint must not stop the writer, training would
+                # block on the full queue
+                print(f"Could not save checkpoint {filename}: {error!r}")
+
+    @staticmethod
+    def write_file(filename: str, data: bytes) -> None:
+        """Atomically replace a file with the given data
+
+        Args:
+            filename (str): Path of the file
+            data (bytes): New content of the file
+        """
+        temporary = f"{filename}.tmp"
+        with open(temporary, "wb") as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, filename)
+
+    def close(self) -> None:
+        """Write the pending checkpoints and stop the writer thread"""
+        if self.writer is not None and self.writer.is_alive():
+            self.pending.put(None)
+            self.writer.join()
+        self.writer = None
+
+        # Do not keep this checkpointer alive until the program exits
+        atexit.unregister(self.close)
@@ -0,0 +1,139 @@
+import hashlib
+from typing import Callable
+
+import neat
+
+from ai.car_fleet import FleetSetup
+from ai.fleet_simulation import FleetSimulation
+from ai.genome_compiler import GenomeCompiler
+
+
+class FitnessCache:
+    """Fitness of already simulated genomes, to skip re-evaluating elites.
+
+    The simulation is deterministic and every car only depends on its own
+    genome: a car stops being updated when it crashes, finishes or is retired
+    by the ProgressWatchdog, and a generation only ends while cars are still
+    running when the tick limit is reached. So the fitness and the final
+    CarState of a genome only depend on its network and on the setup (track,
+    start pose, finish line, physics). They are keyed by the genome hash, and
+    the cache is cleared whenever the setup changes.
+    """
+
+    # Bump when a change of CarFleet or FleetSimulation changes fitness values
+    PHYSICS_VERSION = 2
+
+    MAX_CACHE_SIZE = 10000
+
+    def __init__(self) -> None:
+        # Fitness and final CarState of every genome hash
+        self._fitness: dict[str, tuple[float, int]] = {}
+        self._setup_hash: str | None = None
+
+    @classmethod
+    def get_setup_hash(cls, setup: FleetSetup) -> str:
+        """Hash of everything besides the genome which changes fitness values
+
+        Args:
+            setup (FleetSetup): The track and car setup
+
+        Returns:
+            str: Hexadecimal hash
+        """
+        setup_hash = hashlib.sha1(setup.wall_mask.tobytes())
+        setup_hash.update(
+            repr(
+                (
+                    setup.wall_mask.shape,
+                    setup.start_center,
+                    setup.start_angle,
+                    setup.car_size,
+                    setup.is_map,
+                    setup.finish_line_rect,
+                    setup.track_length,
+                    FleetSimulation.TICK_LIMIT,
+                    cls.PHYSICS_VERSION,
+                )
+            ).encode()
+        )
+        return setup_hash.hexdigest()
+
+    def lookup(
+        self, genomes: list[tuple[int, neat.DefaultGenome]], setup: FleetSetup
+    ) -> tuple[list[int | None], list[str]]:
+        """Set the fitness of the cached genomes
+
+        Args:
+            genomes (list[tuple[int, neat.DefaultGenome]]): The genomes
+            setup (FleetSetup): The track and car setup of this generation
+
+        Returns:
+            tuple[list[int | None], list[str]]: CarState of every genome (None
+            if it is not cached) and the hash of every genome, for store
+        """
+        # A new track, car placement or finish line makes every value stale
+        setup_hash = self.get_setup_hash(setup)
+        if setup_hash != self._setup_hash:
+            self._fitness.clear()
+            self._setup_hash = setup_hash
+
+        states: list[int | None] = []
+        genome_hashes = []
+        for _, genome in genomes:
+            genome_hash = GenomeCompiler.get_genome_hash(genome)
+            cached = self._fitness.get(genome_hash)
+            if cached is not None:
+                genome.fitness, state = cached
+                states.append(state)
+            else:
+                states.append(None)
+            genome_hashes.append(genome_hash)
+        return states, genome_hashes
+
+    def store(self, genome_hash: str, fitness: float, state: int) -> None:
+        """Cache the result of a simulated genome
+
+        Args:
+            genome_hash (str): Hash of the genome, from lookup
+            fitness (float): Fitness of the genome
+            state (int): Final CarState of its car
+        """
+        # Forget the oldest values when the cache is full
+        if (
+            genome_hash not in self._fitness
+            and len(self._fitness) >= self.MAX_CACHE_SIZE
+        ):
+            del self._fitness[next(iter(self._fitness))]
+        self._fitness[genome_hash] = (fitness, state)
+
+    def evaluate(
+        self,
+        genomes: list[tuple[int, neat.DefaultGenome]],
+        config: neat.Config,
+        setup: FleetSetup,
+        fitness_function: Callable[
+            [list[tuple[int, neat.DefaultGenome]], neat.Config], list[int]
+        ],
+    ) -> list[int]:
+        """Evaluate one generation, only simulating the genomes not in the cache
+
+        Args:
+            genomes (list[tuple[int, neat.DefaultGenome]]): The genomes
+            config (neat.Config): The neat config
+            setup (FleetSetup): The track and car setup of this generation
+            fitness_function (Callable): Sets the fitness of the given genomes
+                and returns their CarState
+
+        Returns:
+            list[int]: CarState of every genome, cached or simulated
+        """
+        states, genome_hashes = self.lookup(genomes, setup)
+        missing = [i for i, state in enumerate(states) if state is None]
+        if missing:
+            simulated = fitness_function([genomes[i] for i in missing], config)
+            for i, state in zip(missing, simulated):
+                fitness = genomes[i][1].fitness
+                assert fitness is not None
+                self.store(genome_hashes[i], fitness, state)
+                states[i] = state
+        return states  # type: ignore
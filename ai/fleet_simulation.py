@@ -0,0 +1,113 @@
+import neat
+import numpy as np
+
+from constants import FPS
+from ai.batched_network import BatchedNetwork
+from ai.car_fleet import CarFleet, FleetSetup
+from ai.genome_compiler import GenomeCompiler
+from ai.progress_watchdog import ProgressWatchdog
+
+
+class FleetSimulation:
+    """One generation of cars driven by NEAT networks, without drawing or game state.
+
+    Like CarFleet it is pure data, so it runs the same in CarAI and in the worker
+    processes of ParallelEvaluator.
+    """
+
+    # Length of a generation in simulated seconds, one tick is 1 / FPS seconds
+    TIME_LIMIT = 60
+    TICK_LIMIT = TIME_LIMIT * FPS
+
+    def __init__(
+        self,
+        config: neat.Config,
+        genomes: list[tuple[int, neat.DefaultGenome]],
+        setup: FleetSetup,
+    ) -> None:
+        self.nets = [
+            neat.nn.FeedForwardNetwork.create(genome, config) for _, genome in genomes
+        ]
+        self.BATCHED_NETWORK = BatchedNetwork(self.nets, config)
+
+        # A single genome (e.g. the replayed best genome) is faster with its
+        # compiled activation function than with the batched tensors
+        self.COMPILED_NETWORK = None
+        if len(genomes) == 1:
+            self.COMPILED_NETWORK = GenomeCompiler.compile(genomes[0][1], config)
+        self.FLEET = CarFleet(setup, len(genomes))
+
+        # Stalled or circling cars are retired instead of running until the end
+        self.WATCHDOG = ProgressWatchdog(self.FLEET)
+
+        # Fitness of every genome, only updated while its car is alive
+        self.fitness = np.zeros(len(genomes), dtype=np.float64)
+
+        # Simulation ticks since the generation started
+        self.TICKS = 0
+
+    def compute_actions(self) -> np.ndarray:
+        """Activate the network of every car on its sensor data
+
+        Returns:
+            np.ndarray: (N,) chosen Action of every car
+        """
+        if self.COMPILED_NETWORK is not None:
+            output = self.COMPILED_NETWORK(self.FLEET.sensor_data[0].tolist())
+            return np.array([output.index(max(output))], dtype=np.int64)
+
+        return self.BATCHED_NETWORK.choose(self.FLEET.sensor_data)
+
+    def update(self) -> np.ndarray:
+        """Move every car, then update the fitness of the cars still alive
+
+        Returns:
+            np.ndarray: (N,) current reward of every car
+        """
+        self.FLEET.update()
+
+        rewards = self.FLEET.get_rewards()
+        self.fitness[self.FLEET.alive] = rewards[self.FLEET.alive]
+        return rewards
+
+    def step(self) -> bool:
+        """Run one simulation tick for every car
+
+        Returns:
+            bool: True if the generation is over
+        """
+        self.FLEET.apply_actions(self.compute_actions())
+        self.update()
+        self.FLEET.check_finish_line()
+        self.WATCHDOG.check()
+
+        self.TICKS += 1
+        return self.is_over()
+
+    def is_over(self) -> bool:
+        """Check the end conditions of the generation
+
+        Returns:
+            bool: True if every car has crashed or finished, or the tick limit is reached
+        """
+        active_cars = int(np.count_nonzero(self.FLEET.alive))
+        finish_line_cars = int(np.count_nonzero(self.FLEET.finished))
+
+        return (
+            (active_cars == finish_line_cars and finish_line_cars > 0)  # All finished
+            or active_cars == 0  # All cars crashed
+            or self.TICKS > self.TICK_LIMIT  # Time limit reached
+        )
+
+    def run(self) -> np.ndarray:
+        """Simulate the whole generation
+
+        Returns:
+            np.ndarray: (N,) final fitness of every genome
+        """
+        while not self.step():
+            pass
+
+        # Compute final rewards for the generation after the loop ends
+        self.update()
+        return self.fitness
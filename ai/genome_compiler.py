@@ -0,0 +1,130 @@
+import hashlib
+import math
+from typing import Callable
+
+import neat
+
+
+class GenomeCompiler:
+    """Compiles a genome into a straight-line Python activation function.
+
+    The generated function has the weights, biases and responses inlined and
+    no aggregation/activation lookups, but it does the same float operations
+    in the same order as FeedForwardNetwork.activate, so the outputs are
+    identical. Compiled functions are cached by the hash of the genome
+    structure and weights, so elites surviving across generations (e.g. the
+    replayed best genome) reuse their compiled form.
+    """
+
+    MAX_CACHE_SIZE = 1000
+
+    _CACHE: dict[str, Callable[[list[float]], list[float]]] = {}
+
+    @staticmethod
+    def get_genome_hash(genome: neat.DefaultGenome) -> str:
+        """Hash of the structure and weights of a genome
+
+        Genomes with the same hash have the same network, whatever their key.
+        The connections are hashed in their iteration order: it is the order
+        in which FeedForwardNetwork.activate sums the inputs of a node, so
+        genomes with the same hash have bit-identical outputs.
+
+        Args:
+            genome (neat.DefaultGenome): The genome
+
+        Returns:
+            str: Hexadecimal hash
+        """
+        nodes = sorted(
+            (key, node.bias, node.response, node.activation, node.aggregation)
+            for key, node in genome.nodes.items()
+        )
+        connections = [
+            (key, connection.weight)
+            for key, connection in genome.connections.items()
+            if connection.enabled
+        ]
+        return hashlib.sha1(repr((nodes, connections)).encode()).hexdigest()
+
+    @classmethod
+    def compile(
+        cls, genome: neat.DefaultGenome, config: neat.Config
+    ) -> Callable[[list[float]], list[float]]:
+        """Get the compiled activation function of a genome
+
+        Args:
+            genome (neat.DefaultGenome): The genome
+            config (neat.Config): The neat config
+
+        Returns:
+            Callable[[list[float]], list[float]]: Takes the inputs and returns
+            the outputs, like FeedForwardNetwork.activate
+        """
+        genome_hash = cls.get_genome_hash(genome)
+        activate = cls._CACHE.get(genome_hash)
+        if activate is None:
+            net = neat.nn.FeedForwardNetwork.create(genome, config)
+            activate = cls.compile_network(net, config)
+
+            # Forget the oldest compiled function when the cache is full
+            if len(cls._CACHE) >= cls.MAX_CACHE_SIZE:
+                del cls._CACHE[next(iter(cls._CACHE))]
+            cls._CACHE[genome_hash] = activate
+        return activate
+
+    @staticmethod
+    def compile_network(
+        net: neat.nn.FeedForwardNetwork, config: neat.Config
+    ) -> Callable[[list[float]], list[float]]:
+        """Generate and compile the activation function of a network
+
+        Args:
+            net (neat.nn.FeedForwardNetwork): The network
+            config (neat.Config): The neat config
+
+        Returns:
+            Callable[[list[float]], list[float]]: The activation function
+        """
+        genome_config = config.genome_config
+        tanh = genome_config.activation_defs.get("tanh")
+        sum_aggregation = genome_config.aggregation_function_defs.get("sum")
+
+        # Functions other than tanh/sum are called through the namespace
+        namespace: dict = {"tanh": math.tanh}
+        names = {key: f"i{i}" for i, key in enumerate(net.input_nodes)}
+        lines = [
+            "def activate(inputs):",
+            f"    if len(inputs) != {len(net.input_nodes)}:",
+            f"        raise RuntimeError('Expected {len(net.input_nodes)} inputs')",
+            f"    {', '.join(names[key] for key in net.input_nodes)}, = inputs",
+        ]
+
+        for i, (node, act_func, agg_func, bias, response, links) in enumerate(
+            net.node_evals
+        ):
+            name = f"n{i}"
+            products = [f"{names[key]} * {weight!r}" for key, weight in links]
+
+            # Summed from 0 left to right, exactly like sum()
+            if agg_func is sum_aggregation:
+                total = " + ".join(["0", *products])
+            else:
+                namespace[f"aggregate_{name}"] = agg_func
+                total = f"aggregate_{name}([{', '.join(products)}])"
+            lines.append(f"    {name} = {bias!r} + {response!r} * ({total})")
+
+            # Same as neat's tanh_activation
+            if act_func is tanh:
+                lines.append(f"    {name} = tanh(max(-60.0, min(60.0, 2.5 * {name})))")
+            else:
+                namespace[f"activate_{name}"] = act_func
+                lines.append(f"    {name} = activate_{name}({name})")
+
+            names[node] = name
+
+        # Outputs which are never evaluated keep their initial value
+        outputs = [names.get(key, "0.0") for key in net.output_nodes]
+        lines.append(f"    return [{', '.join(outputs)}]")
+
+        exec(compile("\n".join(lines), "<genome>", "exec"), namespace)
+        return namespace["activate"]
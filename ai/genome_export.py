@@ -0,0 +1,153 @@
+import hashlib
+import json
+import os
+
+import neat
+
+
+class GenomeExport:
+    """The best genome of a checkpoint, in a small JSON file next to it.
+
+    Replaying a checkpoint only needs its best genome, so every checkpoint is
+    exported with a sidecar file (checkpoint-N.best.json) holding the nodes,
+    connections and weights of that genome. Loading it takes milliseconds
+    instead of unpickling the whole population. The file also has a hash of
+    the genome config, so a genome is never rebuilt with a config it was not
+    made for.
+    """
+
+    SUFFIX = ".best.json"
+
+    # Genome config options which change how a genome is turned into a network
+    CONFIG_OPTIONS = (
+        "num_inputs",
+        "num_outputs",
+        "input_keys",
+        "output_keys",
+        "feed_forward",
+        "activation_options",
+        "aggregation_options",
+    )
+
+    @classmethod
+    def get_path(cls, checkpoint_path: str) -> str:
+        """Path of the best genome file of a checkpoint"""
+        return f"{checkpoint_path}{cls.SUFFIX}"
+
+    @classmethod
+    def get_config_hash(cls, config: neat.Config) -> str:
+        """Hash of the genome config options used to build networks
+
+        Args:
+            config (neat.Config): The neat config
+
+        Returns:
+            str: Hexadecimal hash
+        """
+        genome_config = config.genome_config
+        options = [
+            (option, getattr(genome_config, option)) for option in cls.CONFIG_OPTIONS
+        ]
+        return hashlib.sha1(repr(options).encode()).hexdigest()
+
+    @staticmethod
+    def get_best_genome(
+        population: dict[int, neat.DefaultGenome],
+    ) -> tuple[int, neat.DefaultGenome] | None:
+        """Genome with the highest fitness, the first one if several are tied
+
+        Args:
+            population (dict[int, neat.DefaultGenome]): Genomes by key
+
+        Returns:
+            tuple[int, neat.DefaultGenome] | None: Key and genome, None if no
+            genome has a fitness
+        """
+        best = None
+        for genome_id, genome in population.items():
+            if genome.fitness is None:
+                continue
+            if best is None or genome.fitness > best[1].fitness:
+                best = (genome_id, genome)
+        return best
+
+    @classmethod
+    def to_dict(
+        cls, genome_id: int, genome: neat.DefaultGenome, config: neat.Config
+    ) -> dict:
+        """JSON data of a genome
+
+        Args:
+            genome_id (int): Key of the genome
+            genome (neat.DefaultGenome): The genome
+            config (neat.Config): The neat config
+
+        Returns:
+            dict: Data saved in the best genome file
+        """
+        return {
+            "key": genome_id,
+            "fitness": genome.fitness,
+            "config_hash": cls.get_config_hash(config),
+            "nodes": [
+                [key, node.bias, node.response, node.activation, node.aggregation]
+                for key, node in genome.nodes.items()
+            ],
+            "connections": [
+                [in_node, out_node, connection.weight, connection.enabled]
+                for (in_node, out_node), connection in genome.connections.items()
+            ],
+        }
+
+    @staticmethod
+    def save(path: str, data: dict) -> None:
+        """Atomically write the data of a genome
+
+        Args:
+            path (str): Path of the best genome file
+            data (dict): Data from GenomeExport.to_dict
+        """
+        temporary = f"{path}.tmp"
+        with open(temporary, "w") as f:
+            json.dump(data, f)
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path: str, config: neat.Config) -> tuple[int, neat.DefaultGenome]:
+        """Rebuild the genome of a best genome file
+
+        Args:
+            path (str): Path of the best genome file
+            config (neat.Config): The neat config
+
+        Raises:
+            ValueError: If the genome was exported with another genome config
+
+        Returns:
+            tuple[int, neat.DefaultGenome]: Key and genome
+        """
+        with open(path, "r") as f:
+            data = json.load(f)
+
+        if data["config_hash"] != cls.get_config_hash(config):
+            raise ValueError(f"{path} was exported with another genome config")
+
+        genome_config = config.genome_config
+        genome = config.genome_type(data["key"])
+        genome.fitness = data["fitness"]
+
+        for key, bias, response, activation, aggregation in data["nodes"]:
+            node = genome_config.node_gene_type(key)
+            node.bias = bias
+            node.response = response
+            node.activation = activation
+            node.aggregation = aggregation
+            genome.nodes[key] = node
+
+        for in_node, out_node, weight, enabled in data["connections"]:
+            connection = genome_config.connection_gene_type((in_node, out_node))
+            connection.weight = weight
+            connection.enabled = enabled
+            genome.connections[(in_node, out_node)] = connection
+
+        return data["key"], genome
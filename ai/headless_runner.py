@@ -0,0 +1,125 @@
+import os
+import pygame
+import neat
+
+from constants import (
+    WIDTH,
+    HEIGHT,
+    TRACK_CANVAS_WIDTH,
+    TRACK_CANVAS_HEIGHT,
+    NEAT_CONFIG_PATH,
+    CHECKPOINT_FOLDER,
+    CHECKPOINT_INTERVAL,
+    CHECKPOINT_MAX_HISTORY,
+    CHECKPOINT_MAX_BEST,
+)
+
+from ai.car_ai import CarAI
+from ai.checkpoint_writer import AsyncCheckpointer
+from ai.cached_species_set import CachedSpeciesSet
+from ai.car_fleet import FleetSetup
+from ai.fitness_cache import FitnessCache
+from ai.parallel_evaluator import ParallelEvaluator
+from render.game_state import GameState
+
+
+class HeadlessRunner:
+    """Runs NEAT generations without drawing, event polling or frame pacing.
+
+    Every simulation tick is the same as in RunningSimulationWindow, but the
+    generation runs as fast as the machine allows. Generations are limited in
+    ticks (CarAI.TICK_LIMIT), so results match a rendered run.
+    """
+
+    def __init__(self, game_state: GameState) -> None:
+        self.GAME_STATE = game_state
+        self.car_ai: CarAI | None = None
+
+        # Unchanged genomes (e.g. the elites) are not simulated again
+        self.FITNESS_CACHE = FitnessCache()
+
+        # Same track canvas placement as the simulation window, cars use it
+        # to convert the placement data to track coordinates
+        CANVAS_CENTER_X = int(WIDTH // 2)
+        CANVAS_CENTER_Y = int(TRACK_CANVAS_HEIGHT // 2 + HEIGHT * 0.2)
+        track_canvas_rect = pygame.Rect(0, 0, TRACK_CANVAS_WIDTH, TRACK_CANVAS_HEIGHT)
+        track_canvas_rect.center = (CANVAS_CENTER_X, CANVAS_CENTER_Y)
+        self.GAME_STATE.TRACK_CANVAS_RECT = track_canvas_rect
+
+    def run_simulation(
+        self, genomes: list[tuple[int, neat.DefaultGenome]], config: neat.Config
+    ) -> list[int]:
+        """Evaluate one generation, can be passed directly to neat.Population.run
+
+        Returns:
+            list[int]: CarState of every genome
+        """
+        self.car_ai = CarAI(config, genomes, self.GAME_STATE)
+
+        while not self.car_ai.step():
+            pass
+
+        # Compute final rewards for the generation after the loop ends
+        self.car_ai.compute_reward()
+        self.GAME_STATE.BEST_FITNESS = self.car_ai.BEST_FITNESS
+        return self.car_ai.FLEET.get_states().tolist()
+
+    def run(self, generations: int, workers: int = 0) -> neat.DefaultGenome:
+        """Train on the loaded track for the given number of generations
+
+        Args:
+            generations (int): Maximum number of generations to run
+            workers (int): Worker processes evaluating the genomes in parallel,
+                0 evaluates them in this process
+
+        Returns:
+            neat.DefaultGenome: The best genome found
+        """
+        config = neat.Config(
+            neat.DefaultGenome,
+            neat.DefaultReproduction,
+            CachedSpeciesSet,
+            neat.DefaultStagnation,
+            NEAT_CONFIG_PATH,
+        )
+
+        population = neat.Population(config)
+        if self.GAME_STATE.CHECKPOINT_POPULATION is not None:
+            population = self.GAME_STATE.CHECKPOINT_POPULATION
+
+        population.add_reporter(neat.StdOutReporter(True))
+
+        checkpoint_dir = os.path.join(
+            CHECKPOINT_FOLDER, self.GAME_STATE.TRACK.track_name
+        )
+        if not os.path.exists(checkpoint_dir):
+            os.makedirs(checkpoint_dir)
+        checkpointer = AsyncCheckpointer(
+            generation_interval=CHECKPOINT_INTERVAL,
+            time_interval_seconds=None,
+            filename_prefix=os.path.join(checkpoint_dir, "checkpoint-"),
+            max_history=CHECKPOINT_MAX_HISTORY,
+            max_best=CHECKPOINT_MAX_BEST,
+        )
+        population.add_reporter(checkpointer)
+
+        setup = FleetSetup.from_game_state(self.GAME_STATE)
+        evaluator = None
+        evaluate = self.run_simulation
+        if workers > 0:
+            evaluator = ParallelEvaluator(setup, workers)
+            evaluate = evaluator.evaluate
+
+        def evaluate_generation(
+            genomes: list[tuple[int, neat.DefaultGenome]], config: neat.Config
+        ) -> None:
+            self.GAME_STATE.CURRENT_GENERATION += 1
+            self.FITNESS_CACHE.evaluate(genomes, config, setup, evaluate)
+
+        try:
+            return population.run(evaluate_generation, generations)
+        finally:
+            if evaluator is not None:
+                evaluator.close()
+            # Write the checkpoints still waiting in the queue
+            checkpointer.close()
@@ -0,0 +1,133 @@
+import os
+import multiprocessing
+from typing import Callable
+
+import neat
+
+from ai.car_fleet import FleetSetup
+from ai.fitness_cache import FitnessCache
+from ai.fleet_simulation import FleetSimulation
+
+# Track and car setup of the worker process, sent once when the worker starts
+_WORKER_SETUP: FleetSetup | None = None
+
+
+def _init_worker(setup: FleetSetup) -> None:
+    global _WORKER_SETUP
+    _WORKER_SETUP = setup
+
+
+def _evaluate_shard(
+    shard: tuple[list[tuple[int, neat.DefaultGenome]], neat.Config],
+) -> tuple[list[float], list[int]]:
+    genomes, config = shard
+    assert _WORKER_SETUP is not None
+    simulation = FleetSimulation(config, genomes, _WORKER_SETUP)
+    fitness = simulation.run().tolist()
+    return fitness, simulation.FLEET.get_states().tolist()
+
+
+class ParallelEvaluator:
+    """Evaluates the genomes of a generation on a multiprocessing pool.
+
+    The genomes are split in one shard per worker. Every worker keeps its own
+    copy of the track (FleetSetup) and simulates its shard with FleetSimulation,
+    then the fitness values are written back to the genomes and the CarState
+    of every genome is returned. Optionally the first shard is evaluated in
+    this process by a render function (e.g. the simulation window), while the
+    workers evaluate the other shards. With a FitnessCache, the genomes of the
+    worker shards which are in the cache are not simulated again, the rendered
+    shard is always simulated so that every genome of it is drawn.
+    """
+
+    def __init__(
+        self,
+        setup: FleetSetup,
+        num_workers: int | None = None,
+        render_shard: (
+            Callable[[list[tuple[int, neat.DefaultGenome]], neat.Config], list[int]]
+            | None
+        ) = None,
+        fitness_cache: FitnessCache | None = None,
+    ) -> None:
+        """
+        Args:
+            setup (FleetSetup): The track and car setup, sent once to every worker
+            num_workers (int | None): Number of worker processes, all cores if None
+            render_shard (Callable | None): Evaluates the first shard in this
+                process, sets the fitness of its genomes and returns their
+                CarState
+            fitness_cache (FitnessCache | None): Skips the genomes of the
+                worker shards which were already simulated on this setup
+        """
+        self.setup = setup
+        self.fitness_cache = fitness_cache
+        self.num_workers = num_workers or os.cpu_count() or 1
+        self.render_shard = render_shard
+        self.pool = multiprocessing.Pool(
+            self.num_workers, initializer=_init_worker, initargs=(setup,)
+        )
+
+    def split(
+        self, genomes: list[tuple[int, neat.DefaultGenome]], shard_count: int
+    ) -> list[list[tuple[int, neat.DefaultGenome]]]:
+        """Split the genomes in at most shard_count contiguous shards of (almost)
+        equal size"""
+        shard_count = min(len(genomes), shard_count)
+        shard_size, remainder = divmod(len(genomes), max(1, shard_count))
+
+        shards = []
+        start = 0
+        for i in range(shard_count):
+            end = start + shard_size + (1 if i < remainder else 0)
+            shards.append(genomes[start:end])
+            start = end
+        return shards
+
+    def evaluate(
+        self, genomes: list[tuple[int, neat.DefaultGenome]], config: neat.Config
+    ) -> list[int]:
+        """Evaluate one generation, can be passed directly to neat.Population.run
+
+        Returns:
+            list[int]: CarState of every genome, in the order of the genomes
+        """
+        rendered: list[tuple[int, neat.DefaultGenome]] = []
+        if self.render_shard is not None:
+            shards = self.split(genomes, self.num_workers + 1)
+            rendered = shards[0] if shards else []
+        others = genomes[len(rendered) :]
+
+        # Only the genomes which are not in the cache go to the workers
+        states: list[int | None] = [None] * len(others)
+        genome_hashes: list[str] = []
+        if self.fitness_cache is not None:
+            states, genome_hashes = self.fitness_cache.lookup(others, self.setup)
+        missing = [i for i, state in enumerate(states) if state is None]
+
+        shards = self.split([others[i] for i in missing], self.num_workers)
+        results = self.pool.map_async(
+            _evaluate_shard, [(shard, config) for shard in shards]
+        )
+
+        # The rendered shard runs here while the workers simulate the others
+        rendered_states = []
+        if self.render_shard is not None and rendered:
+            rendered_states = self.render_shard(rendered, config)
+
+        simulated = [
+            (fitness, state)
+            for shard_fitness, shard_states in results.get()
+            for fitness, state in zip(shard_fitness, shard_states)
+        ]
+        for i, (fitness, state) in zip(missing, simulated):
+            others[i][1].fitness = fitness
+            states[i] = state
+            if self.fitness_cache is not None:
+                self.fitness_cache.store(genome_hashes[i], fitness, state)
+        return rendered_states + states  # type: ignore
+
+    def close(self) -> None:
+        """Stop the worker processes"""
+        self.pool.close()
+        self.pool.join()
@@ -0,0 +1,109 @@
+import numpy as np
+
+from constants import (
+    PATH_HISTORY_STRIDE,
+    PATH_HISTORY_MAX_LENGTH,
+    PATH_HISTORY_HEADING_CHANGES_ONLY,
+)
+
+
+class PathHistory:
+    """Centers followed by every car of a fleet, in one float32 ring buffer.
+
+    Every recorded tick writes one (x, y) sample per moving car. Only one tick
+    out of `stride` is recorded, and with `heading_changes_only` a sample is
+    kept only if the car turned since its previous sample. Once a car has
+    `max_length` samples, the oldest ones are overwritten.
+    """
+
+    INITIAL_CAPACITY = 256
+
+    def __init__(
+        self,
+        count: int,
+        max_length: int = PATH_HISTORY_MAX_LENGTH,
+        stride: int = PATH_HISTORY_STRIDE,
+        heading_changes_only: bool = PATH_HISTORY_HEADING_CHANGES_ONLY,
+    ) -> None:
+        """
+        Args:
+            count (int): Number of cars
+            max_length (int): Maximum number of samples kept per car
+            stride (int): Record one tick out of `stride`
+            heading_changes_only (bool): Only keep samples where the heading changed
+        """
+        self.max_length = max_length
+        self.stride = stride
+        self.heading_changes_only = heading_changes_only
+
+        # The buffer grows up to max_length, most generations end long before
+        self.points = np.zeros(
+            (count, min(max_length, self.INITIAL_CAPACITY), 2), dtype=np.float32
+        )
+        self.lengths = np.zeros(count, dtype=np.int64)  # Samples written per car
+        self.last_angles = np.full(count, np.nan)
+        self.ticks = 0
+
+    def __len__(self) -> int:
+        return len(self.lengths)
+
+    def record(
+        self, indices: np.ndarray, centers: np.ndarray, angles: np.ndarray
+    ) -> None:
+        """Record the centers of the cars which moved during this tick
+
+        Args:
+            indices (np.ndarray): (N,) indices of the cars
+            centers (np.ndarray): (N, 2) relative centers of the cars
+            angles (np.ndarray): (N,) angles of the cars in degrees
+        """
+        tick = self.ticks
+        self.ticks += 1
+        if tick % self.stride:
+            return
+
+        if self.heading_changes_only:
+            # NaN never compares equal, so the first sample is always kept
+            turned = angles != self.last_angles[indices]
+            indices, centers, angles = indices[turned], centers[turned], angles[turned]
+        if not indices.size:
+            return
+
+        lengths = self.lengths[indices]
+        capacity = self.points.shape[1]
+        if capacity < self.max_length and lengths.max() >= capacity:
+            grown = np.zeros(
+                (len(self.points), min(self.max_length, capacity * 2), 2),
+                dtype=np.float32,
+            )
+            grown[:, :capacity] = self.points
+            self.points = grown
+
+        self.points[indices, lengths % self.max_length] = centers
+        self.lengths[indices] = lengths + 1
+        self.last_angles[indices] = angles
+
+    def get_path(self, index: int) -> np.ndarray:
+        """Get the samples of one car, oldest first
+
+        Args:
+            index (int): Index of the car
+
+        Returns:
+            np.ndarray: (L, 2) float32 relative centers
+        """
+        length = int(self.lengths[index])
+        if length <= self.max_length:
+            return self.points[index, :length]
+
+        # The buffer is full, the oldest sample is the next one to be overwritten
+        start = length % self.max_length
+        return np.concatenate((self.points[index, start:], self.points[index, :start]))
+
+    def to_list(self) -> list[list[list[float]]]:
+        """Get the paths of every car, as JSON serializable lists
+
+        Returns:
+            list[list[list[float]]]: One list of [x, y] samples per car
+        """
+        return [self.get_path(i).tolist() for i in range(len(self))]
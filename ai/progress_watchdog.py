@@ -0,0 +1,59 @@
+import numpy as np
+
+from constants import FPS
+from ai.car_fleet import CarFleet
+
+
+class ProgressWatchdog:
+    """Retires the cars which stopped making progress.
+
+    Cars spinning in place or crawling in circles never crash, so they keep a
+    generation running until the tick limit. The watchdog keeps the centers of
+    the last WINDOW_TIME seconds in a ring buffer and retires every running car
+    whose net displacement over that window is below MIN_DISPLACEMENT car
+    lengths. Retired cars are marked as not alive, so their fitness stays the
+    reward they had when they were retired, and as retired (CarFleet.retired),
+    so they are not counted or drawn as crashed cars.
+    """
+
+    # Sliding window, in simulated seconds
+    WINDOW_TIME = 3
+
+    # Minimum net displacement over the window, in car lengths
+    MIN_DISPLACEMENT = 2
+
+    def __init__(self, fleet: CarFleet) -> None:
+        self.FLEET = fleet
+        self.WINDOW_TICKS = int(self.WINDOW_TIME * FPS)
+        self.MIN_DISTANCE = self.MIN_DISPLACEMENT * float(np.max(fleet.CAR_SIZE))
+
+        # Centers of the last WINDOW_TICKS ticks, one slot per tick
+        self.history = np.repeat(fleet.centers[None], self.WINDOW_TICKS, axis=0)
+        self.index = 0
+        self.ticks = 0
+
+    def check(self) -> np.ndarray:
+        """Retire the running cars which stalled over the last window
+
+        Called once per tick, after the cars moved.
+
+        Returns:
+            np.ndarray: Indices of the cars retired on this tick
+        """
+        fleet = self.FLEET
+        stalled = np.zeros(0, dtype=np.int64)
+
+        # The oldest slot holds the centers of WINDOW_TICKS ticks ago
+        if self.ticks >= self.WINDOW_TICKS:
+            running = np.flatnonzero(fleet.alive & ~fleet.finished)
+            displacement = np.hypot(
+                *(fleet.centers[running] - self.history[self.index, running]).T
+            )
+            stalled = running[displacement < self.MIN_DISTANCE]
+            fleet.alive[stalled] = False
+            fleet.retired[stalled] = True
+
+        self.history[self.index] = fleet.centers
+        self.index = (self.index + 1) % self.WINDOW_TICKS
+        self.ticks += 1
+        return stalled
@@ -0,0 +1,87 @@
+import math
+import numpy as np
+
+from constants import WIDTH
+
+
+class SensorEngine:
+    """Casts the sensors of a whole population in one vectorized call.
+
+    Every ray is sphere-traced over the track wall distance field: from every
+    probe it jumps ahead by the free distance of the field, minus a margin for
+    the integer rounding of the probes. Every skipped probe is guaranteed to be
+    free, so the end point is the same as stepping one pixel at a time. All
+    rays of all cars advance together as NumPy arrays, so the cost per frame no
+    longer grows with Python calls per car.
+    """
+
+    SENSORS_DRAW_DISTANCE: float = WIDTH
+    SENSOR_ANGLES = np.array(range(-90, 90 + 1, 45), dtype=np.float64)
+
+    def __init__(self, wall_distance: np.ndarray) -> None:
+        """
+        Args:
+            wall_distance (np.ndarray): The track wall distance field, indexed as [x, y]
+        """
+        self.wall_distance = wall_distance
+        self.max_length = math.floor(self.SENSORS_DRAW_DISTANCE) + 1
+
+    def cast(
+        self, centers: np.ndarray, angles: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Cast every sensor of the given cars
+
+        Args:
+            centers (np.ndarray): (N, 2) relative centers of the cars
+            angles (np.ndarray): (N,) angles of the cars in degrees
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: (N, 5, 2) relative sensor end points
+            and (N, 5) sensor distances
+        """
+        count = len(angles)
+        sensor_count = len(self.SENSOR_ANGLES)
+        track_x, track_y = self.wall_distance.shape
+
+        # One ray per car and sensor, flattened
+        radians = np.radians(
+            360 - (angles[:, None] + self.SENSOR_ANGLES[None, :])
+        ).ravel()
+        cos = np.cos(radians)
+        sin = np.sin(radians)
+        start_x = np.repeat(np.trunc(centers[:, 0]), sensor_count)
+        start_y = np.repeat(np.trunc(centers[:, 1]), sensor_count)
+
+        lengths = np.zeros(count * sensor_count, dtype=np.int64)
+        end_x = start_x.astype(np.int64)
+        end_y = start_y.astype(np.int64)
+
+        active = np.arange(count * sensor_count)
+        while active.size:
+            length = lengths[active]
+            rel_x = np.trunc(start_x[active] + cos[active] * length).astype(np.int64)
+            rel_y = np.trunc(start_y[active] + sin[active] * length).astype(np.int64)
+            end_x[active] = rel_x
+            end_y[active] = rel_y
+
+            inside = (rel_x > 0) & (rel_x < track_x) & (rel_y > 0) & (rel_y < track_y)
+            free_distance = np.where(
+                inside,
+                self.wall_distance[
+                    np.where(inside, rel_x, 0), np.where(inside, rel_y, 0)
+                ],
+                0,
+            )
+            running = (length < self.max_length) & (free_distance > 0)
+
+            # Every skipped probe is free, see the class docstring
+            step = np.maximum(1, np.trunc(free_distance - 1.5).astype(np.int64))
+            lengths[active] = np.minimum(self.max_length, length + step)
+            active = active[running]
+
+        end_points = np.stack((end_x, end_y), axis=1).reshape(count, sensor_count, 2)
+        delta_x = end_x - start_x.astype(np.int64)
+        delta_y = end_y - start_y.astype(np.int64)
+        distances = np.sqrt(delta_x * delta_x + delta_y * delta_y).astype(np.int64)
+
+        return end_points, distances.reshape(count, sensor_count)
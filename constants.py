@@ -25,6 +25,13 @@ ROAD_LAYER = 1
 
 FPS = 60
 
+# Simulation ticks run per drawn frame, > 1 runs faster than real time
+TIME_SCALE = 1
+
+# Worker processes evaluating genomes in parallel, 0 evaluates everything in the
+# simulation window. With workers only one shard of the population is drawn.
+EVALUATION_WORKERS = 0
+
 DEFAULT_CAR_SIZE_X = 40
 DEFAULT_CAR_SIZE_Y = 24
 CAR_SIZE_RATIO = DEFAULT_CAR_SIZE_Y / DEFAULT_CAR_SIZE_X
@@ -48,6 +55,15 @@ TRACKS_FOLDER = "assets/tracks"
 CHECKPOINT_FOLDER = "checkpoints"
 CHECKPOINT_INTERVAL = 1
 CHECKPOINT_MAX_HISTORY = 100
+CHECKPOINT_MAX_BEST = 5  # Best checkpoints kept besides the last ones
+
+# Precompiled tracks (see TrackCache), rebuilt when the track image changes
+TRACK_CACHE_FOLDER = "cache/tracks"
+
+# Path of every car, stored for the statistics (see PathHistory)
+PATH_HISTORY_STRIDE = 1  # Record one tick out of PATH_HISTORY_STRIDE
+PATH_HISTORY_MAX_LENGTH = 3600  # Samples kept per car, the oldest are overwritten
+PATH_HISTORY_HEADING_CHANGES_ONLY = False  # Only keep samples where the car turned
 
 DATA_FILE = "simulation_data.json"
 LIVE_DATA_FILE = "live_simulation_data.json"
@@ -62,5 +78,6 @@ for folder in [
     MARKERS_FOLDER,
     TRACKS_FOLDER,
     CHECKPOINT_FOLDER,
+    TRACK_CACHE_FOLDER,
 ]:
     os.makedirs(folder, exist_ok=True)
@@ -0,0 +1,96 @@
+import argparse
+import os
+
+# No window is needed, but pygame still has to create a display for the sprites
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+from constants import NEAT_CONFIG_PATH, MAX_SIMULATIONS
+from render.game_state import GameState
+from ai.headless_runner import HeadlessRunner
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Train the cars without a display")
+    parser.add_argument("track", help="Track name (or map name with --map)")
+    parser.add_argument(
+        "--map", action="store_true", help="Use the city map instead of a track"
+    )
+    parser.add_argument(
+        "--car",
+        nargs=2,
+        type=int,
+        required=True,
+        metavar=("X", "Y"),
+        help="Car center on the track canvas",
+    )
+    parser.add_argument("--rotation", type=float, default=0, help="Car rotation")
+    parser.add_argument("--car-size", type=float, default=None, help="Car size")
+    parser.add_argument(
+        "--finish",
+        nargs=2,
+        type=int,
+        required=True,
+        metavar=("X", "Y"),
+        help="Finish marker center on the track canvas",
+    )
+    parser.add_argument(
+        "--finish-size", type=float, default=None, help="Finish marker size"
+    )
+    parser.add_argument("--checkpoint", default=None, help="Checkpoint to resume")
+    parser.add_argument(
+        "--generations", type=int, default=MAX_SIMULATIONS, help="Generations to run"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help="Worker processes evaluating genomes in parallel (0: none)",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+
+    game_state = GameState(NEAT_CONFIG_PATH, False, args.generations)
+    runner = HeadlessRunner(game_state)
+    canvas_x, canvas_y = game_state.TRACK_CANVAS_RECT.topleft
+
+    # Same defaults as the placement windows
+    car_size = args.car_size or (20 if args.map else 40)
+    finish_size = args.finish_size or (20 if args.map else 60)
+
+    game_state.CAR_PREVIEW_DATA.position = (
+        args.car[0] + canvas_x,
+        args.car[1] + canvas_y,
+    )
+    game_state.CAR_PREVIEW_DATA.rotation = args.rotation
+    game_state.CAR_PREVIEW_DATA.size = car_size
+    game_state.FINAL_MARKER_PREVIEW_DATA.position = (
+        args.finish[0] + canvas_x,
+        args.finish[1] + canvas_y,
+    )
+    game_state.FINAL_MARKER_PREVIEW_DATA.size = finish_size
+
+    game_state.TRACK.IS_MAP = args.map
+    if args.map:
+        game_state.TRACK.load_track()
+        game_state.TRACK.track_name = args.track
+        game_state.TRACK.load_roads_from_points(
+            game_state.CAR_PREVIEW_DATA.position,
+            game_state.FINAL_MARKER_PREVIEW_DATA.position,
+            (canvas_x, canvas_y),
+        )
+    else:
+        game_state.load_track(args.track)
+
+    if args.checkpoint is not None:
+        generation = int(args.checkpoint.split("-")[-1])
+        game_state.load_checkpoint(args.checkpoint, generation)
+
+    best_genome = runner.run(args.generations, args.workers)
+    print(f"Best genome: {best_genome.key}, fitness: {best_genome.fitness}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+import pygame
+
+from data_models import Color
+
+from ai.car_fleet import CarFleet
+from render.car_sprites import CarSprites
+from render.game_state import GameState
+
+
+class CarRenderer:
+    """Draws the cars of a CarFleet, the simulation state lives in the fleet.
+
+    Sprites and sensor lines are only computed when a frame is drawn.
+    """
+
+    DRAW_SENSORS: bool = True
+
+    @classmethod
+    def toggle_sensors(cls):
+        """Toggle the visibility of sensors for all cars"""
+        cls.DRAW_SENSORS = not cls.DRAW_SENSORS
+
+    def __init__(self, game_state: GameState) -> None:
+        self.GAME_STATE = game_state
+        self.track_canvas_offset = self.GAME_STATE.TRACK_CANVAS_RECT.topleft
+
+    def get_sprite(self, fleet: CarFleet, index: int) -> pygame.Surface:
+        """Get the rotated sprite matching the state of a car
+
+        Args:
+            fleet (CarFleet): The fleet simulating the car
+            index (int): Index of the car in the fleet
+
+        Returns:
+            pygame.Surface: The rotated sprite, shared by every car
+        """
+        if fleet.finished[index]:
+            kind = CarSprites.FINISHED
+        elif not fleet.alive[index] and not fleet.retired[index]:
+            kind = CarSprites.DEAD
+        else:
+            kind = CarSprites.ALIVE
+
+        # Sprites are scaled to whole pixels, dead cars keep the angle they had
+        # when they crashed, retired cars keep the car sprite where they stopped
+        width, height = fleet.SPRITE_SIZE.tolist()
+        return CarSprites.get_rotated(
+            kind, (width, height), float(fleet.sprite_angles[index])
+        )
+
+    def get_sensors(
+        self, fleet: CarFleet, index: int
+    ) -> list[tuple[tuple[int, int], int]]:
+        """Get the relative end point and distance of every sensor of a car
+
+        Args:
+            fleet (CarFleet): The fleet simulating the car
+            index (int): Index of the car in the fleet
+
+        Returns:
+            list[tuple[tuple[int, int], int]]: Empty until the sensors are cast
+        """
+        if not fleet.has_sensors[index]:
+            return []
+        end_points = fleet.sensor_end_points[index].tolist()
+        distances = fleet.sensor_data[index].tolist()
+        return [(tuple(point), value) for point, value in zip(end_points, distances)]
+
+    def draw(self, screen: pygame.Surface, fleet: CarFleet) -> None:
+        """Draw every car of the fleet
+
+        Args:
+            screen (pygame.Surface): The main display screen.
+            fleet (CarFleet): The fleet to draw
+        """
+        for index in range(fleet.count):
+            self.draw_car(screen, fleet, index)
+
+    def draw_car(self, screen: pygame.Surface, fleet: CarFleet, index: int) -> None:
+        """Draw one car and its sensors, converting relative coords to screen coords.
+
+        Args:
+            screen (pygame.Surface): The main display screen.
+            fleet (CarFleet): The fleet simulating the car
+            index (int): Index of the car in the fleet
+        """
+        sprite = self.get_sprite(fleet, index)
+        position = fleet.positions[index].tolist()  # Relative top-left
+        center = fleet.centers[index].tolist()  # Relative center
+        alive = bool(fleet.alive[index])
+        sensors = self.get_sensors(fleet, index)
+
+        # Get the track's zoom level and viewport
+        zoom_level = self.GAME_STATE.TRACK.zoom_level
+        viewport_x = getattr(self.GAME_STATE.TRACK, "viewport_x", 0)
+        viewport_y = getattr(self.GAME_STATE.TRACK, "viewport_y", 0)
+
+        # If track is not zoomed, use normal drawing
+        if zoom_level == 1.0:
+            # Calculate absolute screen position for blitting
+            screen_pos_x = position[0] + self.track_canvas_offset[0]
+            screen_pos_y = position[1] + self.track_canvas_offset[1]
+            screen_position = (screen_pos_x, screen_pos_y)
+
+            screen.blit(sprite, screen_position)
+
+            # Draw sensors if enabled and car is alive
+            if CarRenderer.DRAW_SENSORS and alive:
+                # Calculate absolute screen center
+                screen_center_x = center[0] + self.track_canvas_offset[0]
+                screen_center_y = center[1] + self.track_canvas_offset[1]
+                screen_center = (screen_center_x, screen_center_y)
+
+                for sensor in sensors:
+                    # Calculate absolute screen position for sensor end point
+                    rel_end_pos = sensor[0]
+                    screen_end_pos_x = rel_end_pos[0] + self.track_canvas_offset[0]
+                    screen_end_pos_y = rel_end_pos[1] + self.track_canvas_offset[1]
+                    screen_end_position = (screen_end_pos_x, screen_end_pos_y)
+
+                    if self.GAME_STATE.TRACK.IS_MAP:
+                        pygame.draw.line(
+                            screen, Color.GREEN, screen_center, screen_end_position, 1
+                        )
+                        pygame.draw.circle(screen, Color.RED, screen_end_position, 2)
+                    else:
+                        pygame.draw.line(
+                            screen, Color.GREEN, screen_center, screen_end_position, 2
+                        )
+                        pygame.draw.circle(screen, Color.RED, screen_end_position, 4)
+        else:
+            # Zoomed drawing - need to transform coordinates
+            canvas_rect = self.GAME_STATE.TRACK_CANVAS_RECT
+
+            # Calculate car position in the zoomed viewport
+            # First get position relative to the viewport
+            rel_view_x = position[0] - viewport_x
+            rel_view_y = position[1] - viewport_y
+
+            # Scale by zoom and add canvas offset
+            screen_pos_x = rel_view_x * zoom_level + canvas_rect.x
+            screen_pos_y = rel_view_y * zoom_level + canvas_rect.y
+
+            # Scale the car sprite based on zoom level
+            zoomed_width = int(sprite.get_width() * zoom_level)
+            zoomed_height = int(sprite.get_height() * zoom_level)
+            zoomed_sprite = pygame.transform.scale(
+                sprite, (zoomed_width, zoomed_height)
+            )
+
+            # Draw the zoomed car
+            screen_position = (screen_pos_x, screen_pos_y)
+            screen.blit(zoomed_sprite, screen_position)
+
+            # Draw sensors if enabled and car is alive
+            if CarRenderer.DRAW_SENSORS and alive:
+                # Calculate center in zoomed coordinates
+                # First get center relative to viewport
+                rel_center_x = center[0] - viewport_x
+                rel_center_y = center[1] - viewport_y
+
+                # Scale by zoom and add canvas offset
+                screen_center_x = rel_center_x * zoom_level + canvas_rect.x
+                screen_center_y = rel_center_y * zoom_level + canvas_rect.y
+                screen_center = (screen_center_x, screen_center_y)
+
+                for sensor in sensors:
+                    # Get the sensor endpoint relative to viewport
+                    rel_end_pos = sensor[0]
+                    rel_end_x = rel_end_pos[0] - viewport_x
+                    rel_end_y = rel_end_pos[1] - viewport_y
+
+                    # Scale by zoom and add canvas offset
+                    screen_end_x = rel_end_x * zoom_level + canvas_rect.x
+                    screen_end_y = rel_end_y * zoom_level + canvas_rect.y
+                    screen_end_position = (screen_end_x, screen_end_y)
+
+                    # Draw sensor with scaled width
+                    line_width = 1 if self.GAME_STATE.TRACK.IS_MAP else 2
+                    circle_radius = 2 if self.GAME_STATE.TRACK.IS_MAP else 4
+
+                    # Scale line width and circle radius with zoom
+                    scaled_width = max(1, int(line_width * zoom_level))
+                    scaled_radius = max(1, int(circle_radius * zoom_level))
+
+                    pygame.draw.line(
+                        screen,
+                        Color.GREEN,
+                        screen_center,
+                        screen_end_position,
+                        scaled_width,
+                    )
+                    pygame.draw.circle(
+                        screen, Color.RED, screen_end_position, scaled_radius
+                    )
@@ -0,0 +1,98 @@
+import os
+import pygame
+
+from constants import CARS_FOLDER
+
+
+class CarSprites:
+    """Process-wide registry of the car sprites.
+
+    Every sprite image is decoded once, scaled sprites are memoized per size
+    and rotated sprites are shared by every car. Cars only turn in fixed angle
+    increments, so the number of distinct orientations is small. Rotated
+    sprites are keyed by (sprite kind, size, angle mod 360), and are cleared
+    when the car size changes.
+    """
+
+    ALIVE = "alive"
+    DEAD = "dead"
+    FINISHED = "finished"
+
+    SPRITE_PATHS = {
+        ALIVE: os.path.join(CARS_FOLDER, "car.png"),
+        DEAD: os.path.join(CARS_FOLDER, "dead_car.png"),
+        FINISHED: os.path.join(CARS_FOLDER, "finish_line_car.png"),
+    }
+
+    _IMAGES: dict[str, pygame.Surface] = {}
+    _SCALED: dict[tuple[str, tuple[int, int]], pygame.Surface] = {}
+    _ROTATED: dict[tuple[str, tuple[int, int], float], pygame.Surface] = {}
+    _SIZE: tuple[int, int] | None = None
+
+    @classmethod
+    def get_image(cls, kind: str) -> pygame.Surface:
+        """Get the unscaled sprite, decoded from disk the first time only
+
+        Args:
+            kind (str): Kind of the sprite (ALIVE, DEAD or FINISHED)
+
+        Returns:
+            pygame.Surface: The sprite, shared, do not draw on it
+        """
+        image = cls._IMAGES.get(kind)
+        if image is None:
+            image = pygame.image.load(cls.SPRITE_PATHS[kind]).convert_alpha()
+            cls._IMAGES[kind] = image
+        return image
+
+    @classmethod
+    def get_scaled(cls, kind: str, size: tuple[int, int]) -> pygame.Surface:
+        """Get the sprite scaled to the given size
+
+        Args:
+            kind (str): Kind of the sprite (ALIVE, DEAD or FINISHED)
+            size (tuple[int, int]): Width and height of the car
+
+        Returns:
+            pygame.Surface: The scaled sprite, shared, do not draw on it
+        """
+        key = (kind, size)
+        scaled = cls._SCALED.get(key)
+        if scaled is None:
+            scaled = pygame.transform.scale(cls.get_image(kind), size)
+            cls._SCALED[key] = scaled
+        return scaled
+
+    @classmethod
+    def get_rotated(
+        cls, kind: str, size: tuple[int, int], angle: float
+    ) -> pygame.Surface:
+        """Get the sprite scaled to the given size and rotated by the given angle
+
+        Args:
+            kind (str): Kind of the sprite (ALIVE, DEAD or FINISHED)
+            size (tuple[int, int]): Width and height of the car
+            angle (float): Rotation in degrees
+
+        Returns:
+            pygame.Surface: The rotated sprite, shared, do not draw on it
+        """
+        # A new car size makes every rotated sprite useless
+        if size != cls._SIZE:
+            cls._ROTATED.clear()
+            cls._SIZE = size
+
+        angle = angle % 360
+        key = (kind, size, angle)
+        rotated = cls._ROTATED.get(key)
+        if rotated is None:
+            rotated = pygame.transform.rotate(cls.get_scaled(kind, size), angle)
+            cls._ROTATED[key] = rotated
+        return rotated
+
+    @classmethod
+    def clear(cls) -> None:
+        """Drop all scaled and rotated sprites, decoded images are kept"""
+        cls._SCALED.clear()
+        cls._ROTATED.clear()
+        cls._SIZE = None
@@ -9,6 +9,7 @@ from data_models import (
     CheckpointPreviewData,
     FinalMarkerPreviewData,
 )
+from ai.genome_export import GenomeExport
 from neural_network.nn import NN
 from render.track import Track
 
@@ -31,6 +32,7 @@ class GameState:
     INPUT_MAP_TEXT: str = ""
     BEST_VISUAL_NN: NN | None = None
     CHECKPOINT_POPULATION: neat.Population | None = None
+    CHECKPOINT_PATH: str | None = None
 
     def __init__(
         self, neat_config_path: str, debug: bool, max_simulations: int
@@ -69,10 +71,49 @@ class GameState:
         self.TRACK.load_track()
 
     def load_checkpoint(self, checkpoint_path: str, generation: int) -> None:
-        """Load or reload the checkpoint."""
+        """Load or reload the checkpoint.
+
+        Replays only need the best genome, so the population is not restored
+        if the checkpoint has a best genome file (see GenomeExport).
+        """
+        self.CHECKPOINT_PATH = checkpoint_path
+        self.CURRENT_GENERATION = generation
+
+        best_genome_path = GenomeExport.get_path(checkpoint_path)
+        if not self.IS_TRAINING_MODE and os.path.exists(best_genome_path):
+            self.CHECKPOINT_POPULATION = None
+            return
+
         checkpoint = neat.Checkpointer.restore_checkpoint(checkpoint_path)
         self.CHECKPOINT_POPULATION = checkpoint
-        self.CURRENT_GENERATION = generation
+
+    def load_best_genome(
+        self, config: neat.Config
+    ) -> tuple[int, neat.DefaultGenome] | None:
+        """Best genome of the loaded checkpoint, for replays
+
+        Args:
+            config (neat.Config): The neat config
+
+        Returns:
+            tuple[int, neat.DefaultGenome] | None: Key and genome, None if no
+            checkpoint is loaded or no genome has a fitness
+        """
+        if self.CHECKPOINT_PATH is None:
+            return None
+
+        best_genome_path = GenomeExport.get_path(self.CHECKPOINT_PATH)
+        if os.path.exists(best_genome_path):
+            try:
+                return GenomeExport.load(best_genome_path, config)
+            except ValueError as error:
+                print(f"{error}, loading the whole checkpoint")
+
+        if self.CHECKPOINT_POPULATION is None:
+            self.CHECKPOINT_POPULATION = neat.Checkpointer.restore_checkpoint(
+                self.CHECKPOINT_PATH
+            )
+        return GenomeExport.get_best_genome(self.CHECKPOINT_POPULATION.population)
 
     def get_previous_state(self) -> AvailableSteps:
         if len(self.PREVIOUS_STATES) > 0:
@@ -0,0 +1,168 @@
+import heapq
+import math
+
+import numpy as np
+
+
+class RoadGraph:
+    """The road cells of the map and their neighbors, built once per roads grid.
+
+    ROADS_DATA is parsed into a boolean grid (ROADS[y, x]) and every road cell
+    gets the tuple of its road neighbors (4-directional), so finding a route
+    does not read the grid again. Routes are found with A* on a binary heap:
+    a cell can be pushed several times, the stale entries are skipped when
+    they are popped (lazy deletion).
+    """
+
+    DIRECTIONS = ((0, -1), (1, 0), (0, 1), (-1, 0))  # up, right, down, left
+
+    # Extra cost of a turn, discourages zig-zags
+    DIRECTION_CHANGE_PENALTY = 1.5
+
+    def __init__(self, roads_data: list[list[int]]) -> None:
+        """
+        Args:
+            roads_data (list[list[int]]): Rows of the roads grid, 1 for a road
+        """
+        self.HEIGHT = len(roads_data)
+        self.WIDTH = len(roads_data[0]) if self.HEIGHT and roads_data[0] else 0
+
+        self.ROADS = np.zeros((self.HEIGHT, self.WIDTH), bool)
+        for y, row in enumerate(roads_data):
+            for x, road in enumerate(row[: self.WIDTH]):
+                self.ROADS[y, x] = road == 1
+
+        # Cells are numbered y * WIDTH + x, NEIGHBORS[cell] holds the
+        # (neighbor, direction index) pairs of a road cell, empty otherwise
+        self.NEIGHBORS: list[tuple[tuple[int, int], ...]] = [
+            () for _ in range(self.WIDTH * self.HEIGHT)
+        ]
+        for y, x in zip(*np.nonzero(self.ROADS)):
+            x, y = int(x), int(y)
+            self.NEIGHBORS[y * self.WIDTH + x] = tuple(
+                ((y + dy) * self.WIDTH + x + dx, direction)
+                for direction, (dx, dy) in enumerate(self.DIRECTIONS)
+                if self.is_road((x + dx, y + dy))
+            )
+
+        self.NEAREST_ROAD = self.build_nearest_road()
+
+    def build_nearest_road(self) -> np.ndarray | None:
+        """Nearest road cell of every cell of the grid
+
+        The distance is the manhattan distance, ties go to the first road cell
+        in row-major order. A road cell is its own nearest road.
+
+        Returns:
+            np.ndarray | None: Array of shape (HEIGHT, WIDTH, 2) holding the
+            (x, y) of the nearest road, None if the grid has no road
+        """
+        road_y, road_x = np.nonzero(self.ROADS)
+        if len(road_x) == 0:
+            return None
+
+        nearest = np.empty((self.HEIGHT, self.WIDTH, 2), np.int32)
+        columns = np.arange(self.WIDTH)[:, None]
+        column_distance = np.abs(columns - road_x)
+
+        # One row at a time, a (WIDTH, road cells) distance matrix
+        for y in range(self.HEIGHT):
+            closest = np.argmin(column_distance + np.abs(y - road_y), axis=1)
+            nearest[y, :, 0] = road_x[closest]
+            nearest[y, :, 1] = road_y[closest]
+        return nearest
+
+    def get_nearest_road(self, cell: tuple[int, int]) -> tuple[int, int]:
+        """Road cell nearest to a cell of the grid
+
+        Args:
+            cell (tuple[int, int]): Cell (x, y) inside the grid
+
+        Returns:
+            tuple[int, int]: Nearest road cell, the cell itself if it is a road
+            or if the grid has no road
+        """
+        if self.NEAREST_ROAD is None:
+            return cell
+        x, y = self.NEAREST_ROAD[cell[1], cell[0]]
+        return int(x), int(y)
+
+    def is_road(self, cell: tuple[int, int]) -> bool:
+        """Whether a cell is inside the grid and is a road"""
+        x, y = cell
+        return 0 <= x < self.WIDTH and 0 <= y < self.HEIGHT and bool(self.ROADS[y, x])
+
+    def find_path(
+        self, start: tuple[int, int], end: tuple[int, int]
+    ) -> list[tuple[int, int]]:
+        """Shortest route between two road cells
+
+        Every move costs 1, plus DIRECTION_CHANGE_PENALTY when it does not go
+        in the same direction as the move before it.
+
+        Args:
+            start (tuple[int, int]): Start cell (x, y)
+            end (tuple[int, int]): End cell (x, y)
+
+        Returns:
+            list[tuple[int, int]]: Cells from start to end, empty if there is
+            no route or a cell is not a road
+        """
+        if not self.is_road(start) or not self.is_road(end):
+            return []
+
+        width = self.WIDTH
+        neighbors = self.NEIGHBORS
+        penalty = self.DIRECTION_CHANGE_PENALTY
+        start_cell = start[1] * width + start[0]
+        end_cell = end[1] * width + end[0]
+        end_x, end_y = end
+
+        g_score = {start_cell: 0.0}
+        came_from: dict[int, int] = {}
+        direction_to: dict[int, int] = {}
+        closed_set = set()
+
+        # Entries are (f_score, insertion order, cell), the order breaks ties
+        counter = 0
+        open_heap = [(math.hypot(start[0] - end_x, start[1] - end_y), 0, start_cell)]
+
+        while open_heap:
+            _, _, current = heapq.heappop(open_heap)
+            if current in closed_set:
+                continue  # Stale entry, the cell was reached with a lower cost
+
+            if current == end_cell:
+                path = [current]
+                while current in came_from:
+                    current = came_from[current]
+                    path.append(current)
+                return [(cell % width, cell // width) for cell in reversed(path)]
+
+            closed_set.add(current)
+            current_g = g_score[current]
+            current_direction = direction_to.get(current)
+
+            for neighbor, direction in neighbors[current]:
+                if neighbor in closed_set:
+                    continue
+
+                tentative_g_score = current_g + 1
+                if current_direction is not None and direction != current_direction:
+                    tentative_g_score += penalty
+
+                if tentative_g_score >= g_score.get(neighbor, math.inf):
+                    continue
+
+                came_from[neighbor] = current
+                direction_to[neighbor] = direction
+                g_score[neighbor] = tentative_g_score
+                counter += 1
+                heuristic = math.hypot(
+                    neighbor % width - end_x, neighbor // width - end_y
+                )
+                heapq.heappush(
+                    open_heap, (tentative_g_score + heuristic, counter, neighbor)
+                )
+
+        return []
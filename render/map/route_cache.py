@@ -0,0 +1,74 @@
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+
+
+class Route:
+    """A planned route and the wall layers of the AI surface drawn from it"""
+
+    def __init__(
+        self,
+        path: list[tuple[int, int]],
+        wall_mask: np.ndarray,
+        wall_distance: np.ndarray,
+    ) -> None:
+        self.path = path
+        self.wall_mask = wall_mask
+        self.wall_distance = wall_distance
+
+
+class RouteCache:
+    """The last planned routes of the map, least recently used ones evicted.
+
+    Placing the car and the destination marker again often asks for a route
+    which was already planned. A route is keyed by its start and end cells,
+    the hash of the roads file and the map offset, and keeps its path (the
+    AI and overlay layers are redrawn from it, a few rects) with the wall mask
+    and wall distance field, which are the expensive part to rebuild.
+    """
+
+    # Every route holds a wall mask and a wall distance field of the canvas
+    MAX_CACHE_SIZE = 8
+
+    def __init__(self) -> None:
+        self._routes: OrderedDict[tuple, Route] = OrderedDict()
+
+    @staticmethod
+    def get_file_hash(path: str) -> str:
+        """Hash of the content of a file
+
+        Args:
+            path (str): Path of the file
+
+        Returns:
+            str: Hexadecimal hash
+        """
+        with open(path, "rb") as f:
+            return hashlib.sha1(f.read()).hexdigest()
+
+    def get(self, key: tuple) -> Route | None:
+        """Route of a key, marked as the most recently used one
+
+        Args:
+            key (tuple): (start cell, end cell, roads hash, offset x, offset y)
+
+        Returns:
+            Route | None: The route, None if it is not cached
+        """
+        route = self._routes.get(key)
+        if route is not None:
+            self._routes.move_to_end(key)
+        return route
+
+    def put(self, key: tuple, route: Route) -> None:
+        """Cache a route, evicting the least recently used one if full
+
+        Args:
+            key (tuple): (start cell, end cell, roads hash, offset x, offset y)
+            route (Route): The planned route
+        """
+        self._routes[key] = route
+        self._routes.move_to_end(key)
+        while len(self._routes) > self.MAX_CACHE_SIZE:
+            self._routes.popitem(last=False)
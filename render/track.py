@@ -1,7 +1,8 @@
 import os
+import cv2
 from PIL import Image
 import pygame
-import math
+import numpy as np
 
 from utils import calculate_track_length, load_csv
 
@@ -17,6 +18,9 @@ from constants import (
 from data_models import Color
 
 from render.map.map_generator import MapGenerator
+from render.map.road_graph import RoadGraph
+from render.map.route_cache import Route, RouteCache
+from render.track_cache import TrackCache
 
 
 class Track:
@@ -24,6 +28,8 @@ class Track:
     BORDER_THICKNESS = 2
     TRACK_LENGTH = 0
     FINAL_LINE_POSITION: tuple[float, float, float] = (0, 0, 0)
+    WALL_COLOR = Color.WHITE
+    OVERLAY_COLOR = pygame.Color(255, 250, 205, 128)  # Route drawn over the map
     SHOW_GRID = True
     SHOW_OVERLAY = True
     SHOW_AI_LAYER = False
@@ -85,7 +91,8 @@ class Track:
 
         self.create_grid()
 
-        # Load track if name is provided
+        # Load track if name is provided, load_track draws the border and
+        # builds the wall mask
         if track_name and track_name != "":
             self.load_track()
         else:
@@ -93,8 +100,9 @@ class Track:
             self.AI_SURFACE.fill(Color.WHITE)
             self.FOREGROUND.fill(Color.WHITE)
 
-        # Draw border
-        self.draw_border()
+            # Draw border
+            self.draw_border()
+            self.build_wall_mask()
 
         self.MAP_TILESET_PATH = "assets/map/tileset.png"
         self.MAP_PATH = "assets/map/map.csv"
@@ -102,6 +110,9 @@ class Track:
 
         self.MAP_DATA = load_csv(self.MAP_PATH)
         self.ROADS_DATA = load_csv(self.ROADS_PATH)
+        self.ROAD_GRAPH = RoadGraph(self.ROADS_DATA)
+        self.ROADS_HASH = RouteCache.get_file_hash(self.ROADS_PATH)
+        self.ROUTE_CACHE = RouteCache()
 
     def create_grid(self) -> None:
         """Create the grid surface with transparent boxes and black 1px borders"""
@@ -156,8 +167,15 @@ class Track:
             )
             self.AI_SURFACE.fill(Color.WHITE)
 
-            # Load the track image
+            # Load the track image, or its precompiled layers if it did not change
             track_path = os.path.join(TRACKS_FOLDER, f"{self.track_name}.png")
+            cache = TrackCache(track_path, (TRACK_CANVAS_WIDTH, TRACK_CANVAS_HEIGHT))
+            layers = cache.load()
+            if layers is not None:
+                self.load_layers(layers)
+                self.draw_border()
+                return
+
             img = Image.open(track_path)
             rgb_img = img.convert("RGB")
             track_image = pygame.image.fromstring(
@@ -186,9 +204,61 @@ class Track:
 
             self.TRACK_LENGTH = calculate_track_length(img)
             self.draw_border()
+            self.build_wall_mask()
+            cache.save(
+                pixels=pygame.surfarray.array3d(self.AI_SURFACE),
+                alpha=pygame.surfarray.array_alpha(self.AI_SURFACE),
+                wall_mask=self.WALL_MASK,
+                wall_distance=self.WALL_DISTANCE,
+                track_length=np.array(self.TRACK_LENGTH),
+            )
         else:
             self.set_foreground()
             self.draw_border()
+            self.build_wall_mask()
+
+    def load_layers(self, layers: dict[str, np.ndarray]) -> None:
+        """Restore the AI surface, wall mask, wall distance and track length
+        of a drawn track from its TrackCache layers
+
+        Args:
+            layers (dict[str, np.ndarray]): Layers from TrackCache.load
+        """
+        width, height = layers["alpha"].shape
+        self.AI_SURFACE = pygame.Surface((width, height), pygame.SRCALPHA)
+        pixels = pygame.surfarray.pixels3d(self.AI_SURFACE)
+        pixels[...] = layers["pixels"]
+        del pixels
+        alpha = pygame.surfarray.pixels_alpha(self.AI_SURFACE)
+        alpha[...] = layers["alpha"]
+        del alpha
+
+        self.WALL_MASK = layers["wall_mask"]
+        self.WALL_DISTANCE = layers["wall_distance"]
+        self.TRACK_LENGTH = int(layers["track_length"])
+
+    def build_wall_mask(self) -> None:
+        """Build the wall mask and wall distance field of the AI surface.
+
+        Both arrays are indexed as [x, y]. A pixel is a wall if it has the
+        collision color, the cars only read these arrays instead of calling
+        get_at on the surface for every probe.
+
+        WALL_DISTANCE holds the euclidean distance from every pixel to the
+        nearest pixel a sensor stops on: a wall, the first row/column, or just
+        outside the surface. It is 0 on those pixels, so sensors can skip ahead
+        by the free distance instead of stepping one pixel at a time.
+        """
+        pixels = pygame.surfarray.array3d(self.AI_SURFACE)
+        alpha = pygame.surfarray.array_alpha(self.AI_SURFACE)
+        self.WALL_MASK = np.all(pixels == self.WALL_COLOR, axis=2) & (alpha == 255)
+
+        # Pad one row/column of stop pixels past the right and bottom edges
+        width, height = self.WALL_MASK.shape
+        free = np.zeros((width + 1, height + 1), np.uint8)
+        free[1:width, 1:height] = ~self.WALL_MASK[1:, 1:]
+        distance = cv2.distanceTransform(free, cv2.DIST_L2, cv2.DIST_MASK_PRECISE)
+        self.WALL_DISTANCE = distance[:width, :height]
 
     def draw_border(self) -> None:
         pygame.draw.rect(
@@ -345,6 +415,7 @@ class Track:
 
         # Redraw the border after filling in road data
         self.draw_border()
+        self.build_wall_mask()
 
         # Also update the GRID_SURFACE with the same offset
         self.create_grid()
@@ -405,72 +476,10 @@ class Track:
             adjusted_start = start_point
             adjusted_end = end_point
 
-        # First, let's create a grid representing where roads exist from ROADS_DATA
-        # 0 = no road, 1 = road
-        grid_width = (
-            len(self.ROADS_DATA[0]) if self.ROADS_DATA and self.ROADS_DATA[0] else 0
-        )
-        grid_height = len(self.ROADS_DATA)
-
-        # Create a grid with roads information
-        road_grid = []
-        for y in range(grid_height):
-            row = []
-            for x in range(len(self.ROADS_DATA[y])):
-                road_value = 0
-                if self.ROADS_DATA[y][x] and self.ROADS_DATA[y][x] != "":
-                    try:
-                        road_value = int(self.ROADS_DATA[y][x])
-                    except ValueError:
-                        pass
-                row.append(road_value)
-            road_grid.append(row)
-
-        # A* pathfinding implementation
-        def heuristic(a, b):
-            """Euclidean distance heuristic with straightness bias"""
-            # Use Euclidean distance instead of Manhattan for more natural paths
-            return math.sqrt((a[0] - b[0]) ** 2 + (a[1] - b[1]) ** 2)
-
-        def get_neighbors(pos, max_width, max_height, current_direction=None):
-            """Get valid neighbor cells that have roads (4-directional movement)
-
-            Now includes the current_direction parameter to favor straight paths
-            """
-            x, y = pos
-            neighbors = []
-            directions = [(0, -1), (1, 0), (0, 1), (-1, 0)]  # up, right, down, left
-
-            # First add neighbors that continue in the same direction (if any)
-            if current_direction is not None:
-                nx, ny = current_direction
-                new_x, new_y = x + nx, y + ny
-                if (
-                    0 <= new_x < max_width
-                    and 0 <= new_y < max_height
-                    and new_y < len(road_grid)
-                    and new_x < len(road_grid[new_y])
-                    and road_grid[new_y][new_x] == 1
-                ):
-                    neighbors.append(((new_x, new_y), current_direction))
-
-            # Then add all other valid neighbors
-            for nx, ny in directions:
-                # Skip if this is the current direction (already added)
-                if current_direction is not None and (nx, ny) == current_direction:
-                    continue
-
-                new_x, new_y = x + nx, y + ny
-                # Ensure neighbor is within grid bounds and is a road
-                if (
-                    0 <= new_x < max_width
-                    and 0 <= new_y < max_height
-                    and new_y < len(road_grid)
-                    and new_x < len(road_grid[new_y])
-                    and road_grid[new_y][new_x] == 1
-                ):
-                    neighbors.append(((new_x, new_y), (nx, ny)))
-            return neighbors
+        # Roads grid and neighbors, parsed once from ROADS_DATA
+        road_graph = self.ROAD_GRAPH
+        grid_width = road_graph.WIDTH
+        grid_height = road_graph.HEIGHT
 
         # Convert pixel coordinates to grid coordinates, accounting for the map offset
         start_grid = (
@@ -495,138 +504,42 @@ class Track:
         print(f"Grid coordinates: {start_grid} -> {end_grid}")
 
         # If start or end is not on a road, find the nearest road
-        if (
-            start_grid[1] < len(road_grid)
-            and start_grid[0] < len(road_grid[start_grid[1]])
-            and road_grid[start_grid[1]][start_grid[0]] != 1
-        ):
+        if grid_width > 0 and not road_graph.is_road(start_grid):
             print("Start point is not on a road. Finding nearest road...")
-            # Simple search for nearest road
-            nearest_road = None
-            min_distance = float("inf")
-            for y in range(len(road_grid)):
-                for x in range(len(road_grid[y])):
-                    if road_grid[y][x] == 1:
-                        dist = abs(x - start_grid[0]) + abs(y - start_grid[1])
-                        if dist < min_distance:
-                            min_distance = dist
-                            nearest_road = (x, y)
-            if nearest_road:
-                start_grid = nearest_road
-                print(f"Adjusted start to nearest road: {start_grid}")
-
-        if (
-            end_grid[1] < len(road_grid)
-            and end_grid[0] < len(road_grid[end_grid[1]])
-            and road_grid[end_grid[1]][end_grid[0]] != 1
-        ):
-            print("End point is not on a road. Finding nearest road...")
-            # Simple search for nearest road
-            nearest_road = None
-            min_distance = float("inf")
-            for y in range(len(road_grid)):
-                for x in range(len(road_grid[y])):
-                    if road_grid[y][x] == 1:
-                        dist = abs(x - end_grid[0]) + abs(y - end_grid[1])
-                        if dist < min_distance:
-                            min_distance = dist
-                            nearest_road = (x, y)
-            if nearest_road:
-                end_grid = nearest_road
-                print(f"Adjusted end to nearest road: {end_grid}")
-
-        # A* algorithm
-        # Priority queue for open nodes
-        open_set = {start_grid}
-        # Set of already processed nodes
-        closed_set = set()
-        # Track where each node came from for path reconstruction
-        came_from = {}
-        # Track the direction to reach each node
-        direction_to = {}
-
-        # G-score: cost from start to current node (using dictionaries with int values)
-        g_score = {}
-        g_score[start_grid] = 0
-        # F-score: estimated total cost (g_score + heuristic)
-        f_score = {}
-        f_score[start_grid] = heuristic(start_grid, end_grid)
-
-        # Main A* loop
-        while open_set:
-            # Get node with lowest f_score
-            current = None
-            lowest_f = float("inf")
-            for pos in open_set:
-                if pos in f_score and f_score[pos] < lowest_f:
-                    lowest_f = f_score[pos]
-                    current = pos
-
-            if current is None:
-                break  # No path found
-
-            # If we reached the end, reconstruct and draw the path
-            if current == end_grid:
-                # Reconstruct path
-                path = []
-                while current in came_from:
-                    path.append(current)
-                    current = came_from[current]
-                path.append(start_grid)
-                path.reverse()
-
-                # Draw the path on AI_SURFACE with proper map offset
-                for grid_pos in path:
-                    road_rect = pygame.Rect(
-                        grid_pos[0] * BOX_SIZE + offset_x,
-                        grid_pos[1] * BOX_SIZE + offset_y,
-                        BOX_SIZE,
-                        BOX_SIZE,
-                    )
-                    pygame.draw.rect(self.AI_SURFACE, Color.BLACK, road_rect)
-
-                break
-
-            # Remove current from open set and add to closed set
-            open_set.remove(current)
-            closed_set.add(current)
-
-            # Get current direction (if any)
-            current_direction = direction_to.get(current, None)
-
-            # Check all neighbors
-            for neighbor_data in get_neighbors(
-                current, grid_width, grid_height, current_direction
-            ):
-                neighbor, direction = neighbor_data
-
-                # Skip if already processed
-                if neighbor in closed_set:
-                    continue
-
-                # Calculate tentative g_score with direction change penalty
-                # Base cost is 1 for movement
-                move_cost = 1
+            start_grid = road_graph.get_nearest_road(start_grid)
+            print(f"Adjusted start to nearest road: {start_grid}")
 
-                # Add direction change penalty
-                if current_direction is not None and direction != current_direction:
-                    # Higher penalty (1.5) for direction changes to discourage zig-zags
-                    move_cost += 1.5
-
-                tentative_g_score = g_score.get(current, float("inf")) + move_cost
+        if grid_width > 0 and not road_graph.is_road(end_grid):
+            print("End point is not on a road. Finding nearest road...")
+            end_grid = road_graph.get_nearest_road(end_grid)
+            print(f"Adjusted end to nearest road: {end_grid}")
+
+        # A* on the road graph, with a penalty for direction changes, unless
+        # the route was planned recently
+        route_key = (start_grid, end_grid, self.ROADS_HASH, offset_x, offset_y)
+        route = self.ROUTE_CACHE.get(route_key)
+        if route is not None:
+            path = route.path
+        else:
+            path = road_graph.find_path(start_grid, end_grid)
 
-                # If neighbor not in open set, add it
-                if neighbor not in open_set:
-                    open_set.add(neighbor)
-                # If this path is not better, skip
-                elif tentative_g_score >= g_score.get(neighbor, float("inf")):
-                    continue
+        # Overlay of the route, the white background is removed
+        self.OVERLAY_SURFACE = pygame.Surface(
+            (TRACK_CANVAS_WIDTH, TRACK_CANVAS_HEIGHT), pygame.SRCALPHA
+        )
+        self.OVERLAY_SURFACE.fill(Color.WHITE)
+        self.OVERLAY_SURFACE.set_colorkey(Color.WHITE)
 
-                # This path is the best so far, record it
-                came_from[neighbor] = current
-                direction_to[neighbor] = direction
-                g_score[neighbor] = tentative_g_score
-                f_score[neighbor] = tentative_g_score + heuristic(neighbor, end_grid)
+        # Draw the path on AI_SURFACE and the overlay with proper map offset
+        for grid_pos in path:
+            road_rect = pygame.Rect(
+                grid_pos[0] * BOX_SIZE + offset_x,
+                grid_pos[1] * BOX_SIZE + offset_y,
+                BOX_SIZE,
+                BOX_SIZE,
+            )
+            pygame.draw.rect(self.AI_SURFACE, Color.BLACK, road_rect)
+            pygame.draw.rect(self.OVERLAY_SURFACE, self.OVERLAY_COLOR, road_rect)
 
         self.TRACK_LENGTH = len(path) * BOX_SIZE
 
@@ -641,25 +554,28 @@ class Track:
             f"Generated path from {start_point} to {end_point}. Track length: {self.TRACK_LENGTH}"
         )
 
-        self.OVERLAY_SURFACE = self.AI_SURFACE.copy()
-        # Remove white background
-        self.OVERLAY_SURFACE.set_colorkey(Color.WHITE)
-
-        for y in range(self.OVERLAY_SURFACE.get_height()):
-            for x in range(self.OVERLAY_SURFACE.get_width()):
-                color = self.OVERLAY_SURFACE.get_at((x, y))
-                if color.r == 0 and color.g == 0 and color.b == 0:
-                    self.OVERLAY_SURFACE.set_at(
-                        (x, y), pygame.Color(255, 250, 205, 128)
-                    )
-
         # Draw border
         self.draw_border()
+        if route is not None:
+            self.WALL_MASK = route.wall_mask
+            self.WALL_DISTANCE = route.wall_distance
+        else:
+            self.build_wall_mask()
+            self.ROUTE_CACHE.put(
+                route_key,
+                Route(path, self.WALL_MASK, self.WALL_DISTANCE),
+            )
 
     # AI Ke liye
     def get_ai_track(self) -> pygame.Surface:
         return self.AI_SURFACE
 
+    def get_wall_mask(self) -> np.ndarray:
+        return self.WALL_MASK
+
+    def get_wall_distance(self) -> np.ndarray:
+        return self.WALL_DISTANCE
+
     def handle_zoom(
         self, zoom_in: bool, mouse_pos: tuple[int, int], canvas_rect: pygame.Rect
     ) -> None:
@@ -0,0 +1,81 @@
+import hashlib
+import os
+
+import numpy as np
+
+from constants import TRACK_CACHE_FOLDER
+
+
+class TrackCache:
+    """The precompiled layers of a drawn track, in one file per track.
+
+    Loading a track scales its image to the canvas, then computes the track
+    length (a skeleton of the full image, which takes seconds on large tracks),
+    the wall mask and the wall distance field. All of them only depend on the
+    image and the canvas size, so they are saved in
+    TRACK_CACHE_FOLDER/<track name>.npz with a key made of the hash of the
+    image file and the canvas size. A cache file with another key (the image
+    was edited, or the canvas size changed) is ignored and overwritten.
+    """
+
+    # Bump when the layers are computed differently
+    VERSION = 1
+
+    FIELDS = ("pixels", "alpha", "wall_mask", "wall_distance", "track_length")
+
+    def __init__(self, track_path: str, canvas_size: tuple[int, int]) -> None:
+        """
+        Args:
+            track_path (str): Path of the track image
+            canvas_size (tuple[int, int]): Width and height of the track canvas
+        """
+        name = os.path.splitext(os.path.basename(track_path))[0]
+        self.path = os.path.join(TRACK_CACHE_FOLDER, f"{name}.npz")
+        self.key = self.get_key(track_path, canvas_size)
+
+    @classmethod
+    def get_key(cls, track_path: str, canvas_size: tuple[int, int]) -> str:
+        """Key of the layers of a track image
+
+        Args:
+            track_path (str): Path of the track image
+            canvas_size (tuple[int, int]): Width and height of the track canvas
+
+        Returns:
+            str: Hexadecimal hash of the image content and canvas size
+        """
+        digest = hashlib.sha1(repr((cls.VERSION, tuple(canvas_size))).encode())
+        with open(track_path, "rb") as f:
+            digest.update(f.read())
+        return digest.hexdigest()
+
+    def load(self) -> dict[str, np.ndarray] | None:
+        """Read the layers of the track
+
+        Returns:
+            dict[str, np.ndarray] | None: Layers by field name, None if there
+            is no cache file for this image and canvas size
+        """
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with np.load(self.path) as data:
+                if str(data["key"]) != self.key:
+                    return None
+                return {field: data[field] for field in self.FIELDS}
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def save(self, **layers: np.ndarray) -> None:
+        """Atomically write the layers of the track
+
+        Args:
+            **layers (np.ndarray): One array per field of TrackCache.FIELDS
+        """
+        temporary = f"{self.path}.tmp"
+        try:
+            with open(temporary, "wb") as f:
+                np.savez_compressed(f, key=self.key, **layers)
+            os.replace(temporary, self.path)
+        except OSError as error:
+            print(f"Could not save track cache {self.path}: {error}")
@@ -1,15 +1,16 @@
 import sys
-import time
 import math
 import os
 import pygame
 import neat
+import numpy as np
 
 
 from constants import (
     WIDTH,
     HEIGHT,
     FPS,
+    TIME_SCALE,
     DEFAULT_FONT,
     TRACK_CANVAS_WIDTH,
     TRACK_CANVAS_HEIGHT,
@@ -18,16 +19,23 @@ from constants import (
     DEBUG,
     CHECKPOINT_FOLDER,
     CHECKPOINT_INTERVAL,
+    CHECKPOINT_MAX_HISTORY,
+    CHECKPOINT_MAX_BEST,
     MAX_SIMULATIONS,
     MAX_HISTORY_SIZE,
     IS_LIVE_DATA,
     MAX_LIVE_HISTORY_SIZE,
+    EVALUATION_WORKERS,
 )
 
 from data_models import Color
 from utils import quit_event
 from ai.car_ai import CarAI
-from render.car import Car
+from ai.checkpoint_writer import AsyncCheckpointer
+from ai.car_fleet import CarFleet, CarState, FleetSetup
+from ai.fitness_cache import FitnessCache
+from ai.parallel_evaluator import ParallelEvaluator
+from render.car_renderer import CarRenderer
 from render.button import Button
 
 from render.game_state import GameState
@@ -52,6 +60,10 @@ class RunningSimulationWindow:
 
     def __init__(self, game_state: GameState) -> None:
         self.GAME_STATE = game_state
+        # Unchanged genomes (e.g. the elites) are not simulated again, the
+        # cache is cleared when the track or the car placement changes. With
+        # workers, the shard drawn here is always simulated.
+        self.FITNESS_CACHE = FitnessCache()
         # Create white background
         BACKGROUND = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
         BACKGROUND.fill(Color.WHITE)
@@ -78,7 +90,7 @@ class RunningSimulationWindow:
         button_height = math.floor(HEIGHT * 0.075)
         button_font_size = math.floor(button_height * 0.35)
 
-        radar_button_text = "Hide Radars" if Car.DRAW_SENSORS else "Show Radars"
+        radar_button_text = "Hide Radars" if CarRenderer.DRAW_SENSORS else "Show Radars"
         self.radar_button = Button(
             WIDTH - button_width - 2,
             2,  # y
@@ -182,7 +194,7 @@ class RunningSimulationWindow:
         # Update instructions based on simulation state
         if self.IS_RUNNING:
             self.instructions = [
-                f"Generation: {self.GAME_STATE.CURRENT_GENERATION}, Alive: {self.GAME_STATE.ALIVE_CARS}, Best Fitness: {self.GAME_STATE.BEST_FITNESS:.2f}, Time Left: {CarAI.TIME_LIMIT - (time.time() - self.simulation_start_time):.2f}s.",
+                f"Generation: {self.GAME_STATE.CURRENT_GENERATION}, Alive: {self.GAME_STATE.ALIVE_CARS}, Best Fitness: {self.GAME_STATE.BEST_FITNESS:.2f}, Time Left: {self.car_ai.get_time_left():.2f}s.",
                 f"Zoom: {self.GAME_STATE.TRACK.zoom_level:.1f}x (CTRL+Wheel to zoom, CTRL+Drag to pan, CTRL+R to reset view)",
                 f"R: Toggle Radars, G: Toggle Grid, O: Toggle Overlay, A: Toggle AI View, L: Store Live Data",
             ]
@@ -207,10 +219,9 @@ class RunningSimulationWindow:
         self.GAME_STATE.TRACK.draw(screen, self.GAME_STATE.TRACK_CANVAS_RECT)
 
         if self.IS_RUNNING:
-            for car in self.car_ai.cars:
-                car.draw(screen)
+            self.car_renderer.draw(screen, self.car_ai.FLEET)
         else:
-            self.test_car.draw(screen)
+            self.car_renderer.draw(screen, self.test_fleet)
 
         # Draw placed marker
         if self.GAME_STATE.FINAL_MARKER_PREVIEW_DATA.position != (0, 0) and hasattr(
@@ -265,35 +276,20 @@ class RunningSimulationWindow:
         )
 
         if not self.GAME_STATE.IS_TRAINING_MODE:
-            if self.GAME_STATE.CHECKPOINT_POPULATION is None:
-                print("No checkpoint population available for replay mode")
+            if self.GAME_STATE.CHECKPOINT_PATH is None:
+                print("No checkpoint available for replay mode")
                 return
 
-            # Get the best genome from the checkpoint population
-            all_genomes = []
-            for (
-                genome_id,
-                genome,
-            ) in self.GAME_STATE.CHECKPOINT_POPULATION.population.items():
-                if genome.fitness is not None:
-                    all_genomes.append((genome_id, genome))
-
-            # Sort genomes by fitness in descending order
-            all_genomes.sort(
-                key=lambda x: (
-                    x[1].fitness if x[1].fitness is not None else -float("inf")
-                ),
-                reverse=True,
-            )
-
-            # Take only the best genome
-            best_genome = all_genomes[:1]
+            # Only the best genome of the checkpoint is replayed
+            best_genome = self.GAME_STATE.load_best_genome(config)
 
-            if not best_genome:
+            if best_genome is None:
                 print("No valid genomes found in checkpoint population")
                 return
 
-            self.run_simulation(best_genome, config)
+            self.GAME_STATE.CURRENT_GENERATION += 1
+            states = self.run_simulation([best_genome], config)
+            self.record_generation([best_genome], states)
             return
 
         # Training mode logic
@@ -302,6 +298,7 @@ class RunningSimulationWindow:
         if self.GAME_STATE.CHECKPOINT_POPULATION is not None:
             population = self.GAME_STATE.CHECKPOINT_POPULATION
 
+        checkpointer = None
         if DEBUG:
             population.add_reporter(neat.StdOutReporter(True))
             population.add_reporter(neat.StatisticsReporter())
@@ -311,25 +308,70 @@ class RunningSimulationWindow:
             )
             if not os.path.exists(checkpoint_dir):
                 os.makedirs(checkpoint_dir)
-            checkpointer = neat.Checkpointer(
+            checkpointer = AsyncCheckpointer(
                 generation_interval=CHECKPOINT_INTERVAL,
-                time_interval_seconds=None,  # type: ignore
+                time_interval_seconds=None,
                 filename_prefix=os.path.join(checkpoint_dir, "checkpoint-"),
+                max_history=CHECKPOINT_MAX_HISTORY,
+                max_best=CHECKPOINT_MAX_BEST,
             )
             population.add_reporter(checkpointer)
 
-        population.run(self.run_simulation, MAX_SIMULATIONS)
+        setup = FleetSetup.from_game_state(self.GAME_STATE)
+        evaluator = None
+
+        # Only the genomes which are not in the cache are simulated and drawn
+        def evaluate(
+            genomes: list[tuple[int, neat.DefaultGenome]], config: neat.Config
+        ) -> list[int]:
+            return self.FITNESS_CACHE.evaluate(
+                genomes, config, setup, self.run_simulation
+            )
+
+        if EVALUATION_WORKERS > 0:
+            # Other shards are evaluated by the workers while one is drawn here
+            evaluator = ParallelEvaluator(
+                setup,
+                EVALUATION_WORKERS,
+                render_shard=self.run_simulation,
+                fitness_cache=self.FITNESS_CACHE,
+            )
+            evaluate = evaluator.evaluate
+
+        def evaluate_generation(
+            genomes: list[tuple[int, neat.DefaultGenome]], config: neat.Config
+        ) -> None:
+            self.GAME_STATE.CURRENT_GENERATION += 1
+            previous_car_ai = getattr(self, "car_ai", None)
+            states = evaluate(genomes, config)
+            # No car is drawn when every genome comes from the cache
+            drawn = self.car_ai is not previous_car_ai
+            # Statistics cover every genome, not only the ones drawn here
+            self.record_generation(genomes, states, drawn)
+
+        try:
+            population.run(evaluate_generation, MAX_SIMULATIONS)
+        finally:
+            if evaluator is not None:
+                evaluator.close()
+            # Write the checkpoints still waiting in the queue
+            if checkpointer is not None:
+                checkpointer.close()
         self.IS_RUNNING = (
             False  # Set running to false after NEAT finishes or is interrupted
         )
 
     def run_simulation(
         self, genomes: list[tuple[int, neat.DefaultGenome]], config: neat.Config
-    ) -> None:
+    ) -> list[int]:
+        """Simulate and draw the cars of the given genomes and set their fitness
+
+        Returns:
+            list[int]: CarState of every genome
+        """
         # Create car_ai with current rotation and scale
         self.car_ai = CarAI(config, genomes, self.GAME_STATE)
 
-        self.simulation_start_time = time.time()
         self.IS_RUNNING = True
         LIVE_DATA_FITNESS_HISTORY = []
         LIVE_DATA_AVG_FITNESS_HISTORY = []
@@ -395,9 +437,9 @@ class RunningSimulationWindow:
                     and event.key == pygame.K_r
                     and not zoom_mode
                 ):
-                    Car.toggle_sensors()
+                    CarRenderer.toggle_sensors()
                     self.radar_button.text = (
-                        "Hide Radars" if Car.DRAW_SENSORS else "Show Radars"
+                        "Hide Radars" if CarRenderer.DRAW_SENSORS else "Show Radars"
                     )
 
                 # Toggle grid with G key
@@ -434,9 +476,9 @@ class RunningSimulationWindow:
 
                 # Pass mouse events to buttons for hover effects and clicks
                 if self.radar_button.handle_event(event):
-                    Car.toggle_sensors()
+                    CarRenderer.toggle_sensors()
                     self.radar_button.text = (
-                        "Hide Radars" if Car.DRAW_SENSORS else "Show Radars"
+                        "Hide Radars" if CarRenderer.DRAW_SENSORS else "Show Radars"
                     )
 
                 if self.grid_button.handle_event(event):
@@ -473,32 +515,16 @@ class RunningSimulationWindow:
                     self.GAME_STATE.TRACK.viewport_y = 0
 
             # ---- Simulation Logic ----
-            self.car_ai.compute()
-            self.car_ai.compute_reward(self.GAME_STATE.TRACK.get_ai_track())
-            self.GAME_STATE.BEST_FITNESS = self.car_ai.BEST_FITNESS
-
-            # Check for finish_line collisions
-            for car in self.car_ai.cars:
-                if car.alive and not car.reached_finish_line:
-                    car.check_finish_line_collision()
-
-            # Update alive car count for display and end condition
-            active_cars = sum(1 for car in self.car_ai.cars if car.alive)
-            finish_line_cars = sum(
-                1 for car in self.car_ai.cars if car.reached_finish_line
-            )
-            self.car_ai.remaining_cars = active_cars
-            self.GAME_STATE.ALIVE_CARS = active_cars
+            # TIME_SCALE ticks per drawn frame, the generation length is in ticks
+            # so it does not depend on how fast frames are drawn
+            generation_over = False
+            for _ in range(TIME_SCALE):
+                generation_over = self.car_ai.step()
+                if generation_over:
+                    break
 
             # End conditions for the current generation
-            if (
-                (
-                    active_cars == finish_line_cars and finish_line_cars > 0
-                )  # All active cars finished
-                or active_cars == 0  # All cars crashed
-                or time.time() - self.simulation_start_time
-                > CarAI.TIME_LIMIT  # Time limit reached
-            ):
+            if generation_over:
                 self.IS_RUNNING = False  # Stop this generation's simulation loop
                 break  # Exit while loop
             # ---------------------------
@@ -513,13 +539,11 @@ class RunningSimulationWindow:
                     else 0
                 )
 
-                DEAD_CARS_COUNT = sum(
-                    1
-                    for car in self.car_ai.cars
-                    if not car.alive and not car.reached_finish_line
-                )
-                FINISH_LINE_CARS_COUNT = sum(
-                    1 for car in self.car_ai.cars if car.reached_finish_line
+                FLEET = self.car_ai.FLEET
+                STATES = FLEET.get_states()
+                DEAD_CARS_COUNT = int(np.count_nonzero(STATES == CarState.CRASHED))
+                FINISH_LINE_CARS_COUNT = int(
+                    np.count_nonzero(STATES == CarState.FINISHED)
                 )
 
                 LIVE_DATA_FITNESS_HISTORY.append(GENERATION_MAX)
@@ -543,12 +567,12 @@ class RunningSimulationWindow:
                     "crash_history": LIVE_DATA_CRASH_HISTORY,
                     "finish_line_history": LIVE_DATA_FINISH_LINE_HISTORY,
                     "detailed_path_data": [
-                        {"path": car.path_history, "fitness": genomes[i][1].fitness}
-                        for i, car in enumerate(self.car_ai.cars)
+                        {"path": path, "fitness": genomes[i][1].fitness}
+                        for i, path in enumerate(FLEET.path_history.to_list())
                     ],
-                    "sensor_data": [car.get_data() for car in self.car_ai.cars],
-                    "velocities": [car.speed for car in self.car_ai.cars],
-                    "headings": [car.angle for car in self.car_ai.cars],
+                    "sensor_data": FLEET.sensor_data.tolist(),
+                    "velocities": FLEET.speeds.tolist(),
+                    "headings": FLEET.angles.tolist(),
                 }
 
                 write_data_to_file(data, True)
@@ -560,9 +584,30 @@ class RunningSimulationWindow:
             # ----------------
 
         # Compute final rewards for the generation after the loop ends
-        self.car_ai.compute_reward(self.GAME_STATE.TRACK.get_ai_track())
+        self.car_ai.compute_reward()
         self.GAME_STATE.BEST_FITNESS = self.car_ai.BEST_FITNESS
 
+        # Reset relevant states for the next generation or exit
+        self.IS_RUNNING = False
+
+        return self.car_ai.FLEET.get_states().tolist()
+
+    def record_generation(
+        self,
+        genomes: list[tuple[int, neat.DefaultGenome]],
+        states: list[int],
+        drawn: bool = True,
+    ) -> None:
+        """Add the statistics of an evaluated generation to the history and
+        write them to the data file
+
+        Args:
+            genomes (list[tuple[int, neat.DefaultGenome]]): Every genome of the
+                generation, with its fitness
+            states (list[int]): CarState of every genome
+            drawn (bool): Whether cars were drawn for this generation, the
+                path, sensor and heading data are empty otherwise
+        """
         GENERATION_FITNESS: list[float] = [genome[1].fitness for genome in genomes]  # type: ignore
         GENERATION_MAX = max(GENERATION_FITNESS) if GENERATION_FITNESS else 0
         GENERATION_AVG = (
@@ -570,15 +615,11 @@ class RunningSimulationWindow:
             if GENERATION_FITNESS
             else 0
         )
+        self.GAME_STATE.BEST_FITNESS = GENERATION_MAX
 
-        DEAD_CARS_COUNT = sum(
-            1
-            for car in self.car_ai.cars
-            if not car.alive and not car.reached_finish_line
-        )
-        FINISH_LINE_CARS_COUNT = sum(
-            1 for car in self.car_ai.cars if car.reached_finish_line
-        )
+        STATES = np.array(states, dtype=np.int64)
+        DEAD_CARS_COUNT = int(np.count_nonzero(STATES == CarState.CRASHED))
+        FINISH_LINE_CARS_COUNT = int(np.count_nonzero(STATES == CarState.FINISHED))
 
         self.FITNESS_HISTORY.append(GENERATION_MAX)
         self.AVG_FITNESS_HISTORY.append(GENERATION_AVG)
@@ -594,26 +635,33 @@ class RunningSimulationWindow:
             if len(history) > MAX_HISTORY_SIZE:
                 del history[0]
 
+        # Paths, sensors and headings only exist for the cars drawn here
+        PATHS, SENSORS, VELOCITIES, HEADINGS = [], [], [], []
+        if drawn:
+            FLEET = self.car_ai.FLEET
+            DRAWN_GENOMES = self.car_ai.genomes
+            PATHS = [
+                {"path": path, "fitness": DRAWN_GENOMES[i][1].fitness}
+                for i, path in enumerate(FLEET.path_history.to_list())
+            ]
+            SENSORS = FLEET.sensor_data.tolist()
+            VELOCITIES = FLEET.speeds.tolist()
+            HEADINGS = FLEET.angles.tolist()
+
         data = {
             "generation": self.GAME_STATE.CURRENT_GENERATION,
             "fitness_history": self.FITNESS_HISTORY,
             "avg_fitness_history": self.AVG_FITNESS_HISTORY,
             "crash_history": self.CRASH_HISTORY,
             "finish_line_history": self.FINISH_LINE_HISTORY,
-            "detailed_path_data": [
-                {"path": car.path_history, "fitness": genomes[i][1].fitness}
-                for i, car in enumerate(self.car_ai.cars)
-            ],
-            "sensor_data": [car.get_data() for car in self.car_ai.cars],
-            "velocities": [car.speed for car in self.car_ai.cars],
-            "headings": [car.angle for car in self.car_ai.cars],
+            "detailed_path_data": PATHS,
+            "sensor_data": SENSORS,
+            "velocities": VELOCITIES,
+            "headings": HEADINGS,
         }
 
         write_data_to_file(data, False)
 
-        # Reset relevant states for the next generation or exit
-        self.IS_RUNNING = False
-
     def handle_event(self, event: pygame.event.Event) -> None:
         # Get mouse position and key state
         mouse_pos = pygame.mouse.get_pos()
@@ -654,9 +702,9 @@ class RunningSimulationWindow:
 
         # Toggle radar with R key (without CTRL)
         elif event.type == pygame.KEYDOWN and event.key == pygame.K_r and not zoom_mode:
-            Car.toggle_sensors()
+            CarRenderer.toggle_sensors()
             self.radar_button.text = (
-                "Hide Radars" if Car.DRAW_SENSORS else "Show Radars"
+                "Hide Radars" if CarRenderer.DRAW_SENSORS else "Show Radars"
             )
 
         # Toggle grid with G key
@@ -704,9 +752,9 @@ class RunningSimulationWindow:
 
         if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
             if self.radar_button.is_hovered:
-                Car.toggle_sensors()
+                CarRenderer.toggle_sensors()
                 self.radar_button.text = (
-                    "Hide Radars" if Car.DRAW_SENSORS else "Show Radars"
+                    "Hide Radars" if CarRenderer.DRAW_SENSORS else "Show Radars"
                 )
 
             elif self.grid_button.is_hovered:
@@ -761,7 +809,9 @@ class RunningSimulationWindow:
         self.EXIT_LOOP = False
         self.IS_RUNNING = False  # Ensure simulation is not running initially
 
-        self.test_car = Car(self.GAME_STATE)  # Create test car for preview
+        self.car_renderer = CarRenderer(self.GAME_STATE)
+        # Create test car for preview
+        self.test_fleet = CarFleet(FleetSetup.from_game_state(self.GAME_STATE), 1)
         self.GAME_STATE.ALIVE_CARS = 0
         self.GAME_STATE.BEST_FITNESS = 0.0
 
@@ -6,13 +6,21 @@ from data_models import AvailableSteps, Color
 from constants import WIDTH, HEIGHT, FPS, DEFAULT_FONT, CHECKPOINT_FOLDER
 from utils import quit_event
 
+from ai.checkpoint_store import CheckpointStore
 from render.game_state import GameState
 from render.button import Button
 
 
 class CheckpointPreview:
     def __init__(
-        self, x: int, y: int, width: int, height: int, name: str, path: str
+        self,
+        x: int,
+        y: int,
+        width: int,
+        height: int,
+        name: str,
+        path: str,
+        details: str = "",
     ) -> None:
         self.x = x
         self.y = y
@@ -21,9 +29,13 @@ class CheckpointPreview:
         self.rect = pygame.Rect(x, y, width, height)
         self.name = name
         self.path = path
+        self.details = details
         self.y_offset = 0
 
         self.FONT = pygame.font.SysFont(DEFAULT_FONT, math.floor(HEIGHT * 0.025))
+        self.DETAILS_FONT = pygame.font.SysFont(
+            DEFAULT_FONT, math.floor(HEIGHT * 0.018)
+        )
 
     def draw(self, screen: pygame.Surface) -> None:
         # Update rect position with scroll offset
@@ -35,12 +47,19 @@ class CheckpointPreview:
         pygame.draw.rect(
             screen, Color.BLACK, (self.x, adjusted_y, self.width, self.height), 2
         )
+        # Name in the middle, or above the details line if there is one
+        name_y = adjusted_y + self.height / (3 if self.details else 2)
         text = self.FONT.render(self.name, True, Color.BLACK)
-        text_rect = text.get_rect(
-            center=(self.x + self.width / 2, adjusted_y + self.height / 2)
-        )
+        text_rect = text.get_rect(center=(self.x + self.width / 2, name_y))
         screen.blit(text, text_rect)
 
+        if self.details:
+            details = self.DETAILS_FONT.render(self.details, True, Color.BLACK)
+            details_rect = details.get_rect(
+                center=(self.x + self.width / 2, adjusted_y + self.height * 2 / 3)
+            )
+            screen.blit(details, details_rect)
+
     def handle_event(self, event: pygame.event.Event) -> bool:
         if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
             # Create a temporary rect with the scrolled position for collision detection
@@ -181,19 +200,18 @@ class SelectGenerationWindow:
             os.makedirs(path)
             self.CHECKPOINTS = []
             return
-        checkpoints = os.listdir(path)
-        # Sort checkpoints by generation number instead of alphabetically
-        checkpoints.sort(key=lambda x: int(x.split("-")[-1]))
+        # Listed from the index of the store, without loading the checkpoints
+        entries = CheckpointStore(path).get_entries()
         previews = []
-        for i, checkpoint in enumerate(checkpoints):
+        for i, entry in enumerate(entries):
             row = i // self.GRID_COLUMNS
             col = i % self.GRID_COLUMNS
             x_pos = self.START_X + col * (self.PREVIEW_WIDTH + self.GRID_SPACE)
             # Use PREVIEW_SPACING_Y instead of PREVIEW_HEIGHT for vertical spacing
             y_pos = self.START_Y + row * self.PREVIEW_SPACING_Y
 
-            checkpoint_path = os.path.join(path, checkpoint)
-            checkpoint_name = os.path.splitext(checkpoint)[0]
+            checkpoint_path = os.path.join(path, entry["file"])
+            checkpoint_name = os.path.splitext(entry["file"])[0]
 
             preview = CheckpointPreview(
                 x_pos,
@@ -202,6 +220,7 @@ class SelectGenerationWindow:
                 self.PREVIEW_HEIGHT,
                 checkpoint_name,
                 checkpoint_path,
+                self.get_details(entry),
             )
             previews.append(preview)
         self.CHECKPOINTS = previews
@@ -212,6 +231,17 @@ class SelectGenerationWindow:
             content_height = last_preview.y + self.PREVIEW_HEIGHT - self.START_Y
             self.max_scroll = min(0, self.VISIBLE_AREA_HEIGHT - content_height)
 
+    @staticmethod
+    def get_details(entry: dict) -> str:
+        """Summary of a checkpoint entry of the CheckpointStore index"""
+        size = f"{entry['size'] / 1024:.0f} KB"
+        if entry["best_fitness"] is None:
+            return size
+        return (
+            f"Best {entry['best_fitness']:.1f} | "
+            f"{entry['species']} species | {size}"
+        )
+
     def handle_event(self, event: pygame.event.Event) -> None:
         for button in self.buttons:
             if button.handle_event(event):